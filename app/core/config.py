@@ -3,142 +3,199 @@ HVAC Email Automation v3.0 - Configuration
 Production configuration with credentials.txt file support
 """
 import os
-from typing import List, Dict
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, List, Dict, Optional, Tuple
 
-def load_credentials_from_file(file_path: str = "credentials.txt") -> Dict[str, str]:
-    """Load credentials from text file"""
-    credentials = {}
-    
-    # Try to find credentials file
-    possible_paths = [
+@lru_cache(maxsize=1)
+def _read_credentials(file_path: str) -> Tuple[Optional[Path], Dict[str, str]]:
+    """Open the first credentials file found and parse it, caching misses as well as hits"""
+    possible_paths = (
         file_path,
         os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), file_path),
         os.path.join(os.getcwd(), file_path)
-    ]
+    )
     
     for path in possible_paths:
-        if os.path.exists(path):
-            try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            credentials[key.strip()] = value.strip()
-                break
-            except Exception as e:
-                print(f"Warning: Could not read credentials file {path}: {e}")
-                continue
+        # Let open() do the existence check: one syscall on the common path
+        try:
+            f = open(path, 'r', encoding='utf-8')
+        except (FileNotFoundError, IsADirectoryError):
+            continue
+        except Exception as e:
+            # e.g. PermissionError: fall through to the next candidate like a missing file
+            print(f"Warning: Could not read credentials file {path}: {e}")
+            continue
+        
+        credentials = {}
+        try:
+            with f:
+                for line in f:
+                    line = line.strip()
+                    if not line or line[0] == '#':
+                        continue
+                    key, sep, value = line.partition('=')
+                    if not sep:
+                        continue
+                    credentials[key.strip()] = value.strip()
+        except Exception as e:
+            print(f"Warning: Could not read credentials file {path}: {e}")
+            continue
+        
+        return Path(path), credentials
     
-    return credentials
+    return None, {}
 
-# Load credentials from file
-_credentials = load_credentials_from_file()
+def load_credentials_from_file(file_path: str = "credentials.txt") -> Dict[str, str]:
+    """Load credentials from text file"""
+    return dict(_read_credentials(file_path)[1])
 
 def get_credential(key: str, default: str = '') -> str:
     """Get credential value with fallback to environment variable"""
-    return _credentials.get(key, os.getenv(key, default))
+    return _ENV_SNAPSHOT.get(key, default)
 
-class Config:
-    """Application configuration loaded from credentials.txt file"""
-    
+def _as_bool(value: str) -> bool:
+    return value.lower() == 'true'
+
+def _split_csv(value: str) -> Tuple[str, ...]:
+    return tuple(sys.intern(item.strip()) for item in value.split(','))
+
+def _parse_city_coordinates(value: str) -> Dict[str, Tuple[float, float, float]]:
+    """Parse 'City:lat:lng:radius_km,...' into {city: (lat, lng, radius_km)}"""
+    coordinates = {}
+    for item in value.split(','):
+        parts = item.strip().split(':')
+        if len(parts) == 4:
+            try:
+                coordinates[sys.intern(parts[0].strip())] = (float(parts[1]), float(parts[2]), float(parts[3]))
+            except ValueError:
+                continue
+    return coordinates
+
+# Lazily resolved settings: attribute name -> (credential key, default, converter)
+_DEFAULTS: Dict[str, Tuple[str, str, Callable[[str], Any]]] = {
     # Server Configuration
-    SERVER_IP = get_credential('SERVER_IP', 'localhost')  # SECURITY: Removed hardcoded IP
-    LOG_LEVEL = get_credential('LOG_LEVEL', 'INFO')
+    'SERVER_IP': ('SERVER_IP', 'localhost', str),  # SECURITY: Removed hardcoded IP
+    'LOG_LEVEL': ('LOG_LEVEL', 'INFO', str),
     
     # API Keys - Loaded from credentials.txt file
-    GOOGLE_PLACES_API_KEY = get_credential('GOOGLE_PLACES_API_KEY', '')
-    HUNTER_API_KEY = get_credential('HUNTER_API_KEY', '')
+    'GOOGLE_PLACES_API_KEY': ('GOOGLE_PLACES_API_KEY', '', str),
+    'HUNTER_API_KEY': ('HUNTER_API_KEY', '', str),
     
     # Email Configuration - Loaded from credentials.txt file
     # Gmail (Legacy - for fallback)
-    GMAIL_USER = get_credential('GMAIL_USER', '')
-    GMAIL_APP_PASSWORD = get_credential('GMAIL_APP_PASSWORD', '')
+    'GMAIL_USER': ('GMAIL_USER', '', str),
+    'GMAIL_APP_PASSWORD': ('GMAIL_APP_PASSWORD', '', str),
     
     # Mailgun (Primary email service)
-    MAILGUN_API_KEY = get_credential('MAILGUN_API_KEY', '')
-    MAILGUN_DOMAIN = get_credential('MAILGUN_DOMAIN', 'mg.stxautomate.com')
-    MAILGUN_REGION = get_credential('MAILGUN_REGION', 'US')  # US or EU
-    MAILGUN_FROM_EMAIL = f"noreply@{get_credential('MAILGUN_DOMAIN', 'mg.stxautomate.com')}"
+    'MAILGUN_API_KEY': ('MAILGUN_API_KEY', '', str),
+    'MAILGUN_DOMAIN': ('MAILGUN_DOMAIN', 'mg.stxautomate.com', str),
+    'MAILGUN_REGION': ('MAILGUN_REGION', 'US', str),  # US or EU
+    'MAILGUN_FROM_EMAIL': ('MAILGUN_DOMAIN', 'mg.stxautomate.com', lambda domain: f"noreply@{domain}"),
     
     # Search Configuration - Handle potential None values
-    CITIES = [city.strip() for city in get_credential('CITIES', 'Houston,Dallas,Austin,San Antonio,Fort Worth').split(',')]
-    SEARCH_KEYWORDS = [keyword.strip() for keyword in get_credential('SEARCH_KEYWORDS', 'HVAC,air conditioning,heating,cooling,HVAC contractor').split(',')]
+    'CITIES': ('CITIES', 'Houston,Dallas,Austin,San Antonio,Fort Worth', _split_csv),
+    'SEARCH_KEYWORDS': ('SEARCH_KEYWORDS', 'HVAC,air conditioning,heating,cooling,HVAC contractor', _split_csv),
+    'CITIES_SET': ('CITIES', 'Houston,Dallas,Austin,San Antonio,Fort Worth', lambda value: frozenset(_split_csv(value))),
+    # Grid search: each city with coordinates is split into GRID_SIZE x GRID_SIZE
+    # location-biased queries to get past the 20-results-per-query cap (1 = off)
+    'PLACES_GRID_SIZE': ('PLACES_GRID_SIZE', '1', int),
+    'PLACES_CACHE_HOURS': ('PLACES_CACHE_HOURS', '24', int),   # Reuse identical query results (0 = off)
+    'CITY_COORDINATES': ('CITY_COORDINATES',
+                         'Houston:29.7604:-95.3698:40,Dallas:32.7767:-96.7970:35,Austin:30.2672:-97.7431:25,'
+                         'San Antonio:29.4241:-98.4936:35,Fort Worth:32.7555:-97.3308:30',
+                         _parse_city_coordinates),
     
     # Affiliate Configuration - Loaded from credentials.txt file
-    FIVERR_AFFILIATE_LINK = get_credential('FIVERR_AFFILIATE_LINK', '')
+    'FIVERR_AFFILIATE_LINK': ('FIVERR_AFFILIATE_LINK', '', str),
     
     # Rate Limiting - Optimized for Mailgun API
-    MAX_EMAILS_PER_DAY = int(get_credential('MAX_EMAILS_PER_DAY', '1000'))  # Increased from 50
-    MAX_EMAILS_PER_RUN = int(get_credential('MAX_EMAILS_PER_RUN', '100'))   # Increased from 25
-    EMAIL_DELAY_SECONDS = int(get_credential('EMAIL_DELAY_SECONDS', '10'))  # Reduced from 30
-    EMAIL_DELAY_MIN = int(get_credential('EMAIL_DELAY_MIN', '5'))           # Reduced from 120
-    EMAIL_DELAY_MAX = int(get_credential('EMAIL_DELAY_MAX', '15'))          # Reduced from 300
-    MAX_HUNTER_REQUESTS_PER_DAY = int(get_credential('MAX_HUNTER_REQUESTS_PER_DAY', '100'))
-    EMAIL_COOLDOWN_HOURS = int(get_credential('EMAIL_COOLDOWN_HOURS', '24'))  # Reduced from 72
-    COOLDOWN_DAYS = int(get_credential('COOLDOWN_DAYS', '1'))               # Reduced from 7
-    THROTTLE_DELAY = int(get_credential('THROTTLE_DELAY', '1'))             # Reduced from 2
+    'MAX_EMAILS_PER_DAY': ('MAX_EMAILS_PER_DAY', '1000', int),  # Increased from 50
+    'MAX_EMAILS_PER_RUN': ('MAX_EMAILS_PER_RUN', '100', int),   # Increased from 25
+    'MAX_EMAILS_PER_MINUTE': ('MAX_EMAILS_PER_MINUTE', '12', int),  # Send pace shared by all Mailgun workers
+    'MAX_HUNTER_REQUESTS_PER_DAY': ('MAX_HUNTER_REQUESTS_PER_DAY', '100', int),
+    'HUNTER_CONCURRENCY': ('HUNTER_CONCURRENCY', '5', int),     # Leads looked up in parallel
+    'HUNTER_REQUESTS_PER_MINUTE': ('HUNTER_REQUESTS_PER_MINUTE', '300', int),  # Client-side request quota
+    'PLACES_CONCURRENCY': ('PLACES_CONCURRENCY', '5', int),     # Google Places queries in flight
+    'MAILGUN_CONCURRENCY': ('MAILGUN_CONCURRENCY', '3', int),   # Mailgun sends in flight, sharing the MAX_EMAILS_PER_MINUTE pace
+    'EMAIL_COOLDOWN_HOURS': ('EMAIL_COOLDOWN_HOURS', '24', int),  # Reduced from 72
+    'COOLDOWN_DAYS': ('COOLDOWN_DAYS', '1', int),               # Reduced from 7
+    'PLACES_REQUESTS_PER_SECOND': ('PLACES_REQUESTS_PER_SECOND', '5', float),  # Places token bucket rate
     
     # Mailgun API Configuration
-    MAILGUN_API_TIMEOUT = int(get_credential('MAILGUN_API_TIMEOUT', '30'))
-    MAILGUN_ENABLE_TRACKING = get_credential('MAILGUN_ENABLE_TRACKING', 'true').lower() == 'true'
-    MAILGUN_TRACK_CLICKS = get_credential('MAILGUN_TRACK_CLICKS', 'true').lower() == 'true'
-    MAILGUN_TRACK_OPENS = get_credential('MAILGUN_TRACK_OPENS', 'true').lower() == 'true'
+    'MAILGUN_API_TIMEOUT': ('MAILGUN_API_TIMEOUT', '30', int),
+    # Recipients per Mailgun call, personalized via recipient-variables (1 = one call per
+    # lead, paced by MAX_EMAILS_PER_MINUTE; larger batches are paced per call, max 1000)
+    'MAILGUN_BATCH_SIZE': ('MAILGUN_BATCH_SIZE', '1', int),
+    'MAILGUN_ENABLE_TRACKING': ('MAILGUN_ENABLE_TRACKING', 'true', _as_bool),
+    'MAILGUN_TRACK_CLICKS': ('MAILGUN_TRACK_CLICKS', 'true', _as_bool),
+    'MAILGUN_TRACK_OPENS': ('MAILGUN_TRACK_OPENS', 'true', _as_bool),
+    'MAILGUN_SEND_HTML': ('MAILGUN_SEND_HTML', 'true', _as_bool),  # false = text-only sends (no open tracking)
     
     # Database
-    DATABASE_PATH = get_credential('DATABASE_PATH', 'hvac_automation.db')
-    BACKUP_DIR = get_credential('BACKUP_DIR', 'backups')
-    BACKUP_RETENTION_DAYS = int(get_credential('BACKUP_RETENTION_DAYS', '30'))
+    'DATABASE_PATH': ('DATABASE_PATH', 'hvac_automation.db', str),
+    'BACKUP_DIR': ('BACKUP_DIR', 'backups', str),
+    'BACKUP_RETENTION_DAYS': ('BACKUP_RETENTION_DAYS', '30', int),
     
     # Notifications
-    NOTIFICATION_EMAIL = get_credential('NOTIFICATION_EMAIL', '')
+    'NOTIFICATION_EMAIL': ('NOTIFICATION_EMAIL', '', str),
     
     # Monitoring and Dashboard
-    ENABLE_MONITORING = get_credential('ENABLE_MONITORING', 'true').lower() == 'true'
-    ENABLE_WEB_DASHBOARD = get_credential('ENABLE_WEB_DASHBOARD', 'true').lower() == 'true'
-    DASHBOARD_PORT = int(get_credential('DASHBOARD_PORT', '8080'))
-    
-    # Email Templates - Match what email_sender.py expects
-    EMAIL_SUBJECT_TEMPLATE = "Boost Your HVAC Business with Professional Marketing"
-    EMAIL_TEMPLATE = """Hi {business_name},
-
-I hope this message finds you well. I came across your HVAC business and wanted to share an opportunity that could significantly boost your customer acquisition.
-
-As a fellow business professional, I understand the challenges of finding quality leads in the competitive HVAC market. That's why I want to introduce you to a proven solution that's helping HVAC contractors nationwide:
-
-🔥 **Professional HVAC Marketing Solutions**
-- Custom landing pages designed specifically for HVAC contractors
-- Lead generation systems that convert visitors into paying customers
-- Professional sales funnels that work 24/7
-- Proven strategies that increase customer engagement
-
-Why am I sharing this with you? Because I believe in supporting local HVAC businesses, and I've seen these tools help contractors just like you increase their customer base by 40-60%.
+    'ENABLE_MONITORING': ('ENABLE_MONITORING', 'true', _as_bool),
+    'ENABLE_WEB_DASHBOARD': ('ENABLE_WEB_DASHBOARD', 'true', _as_bool),
+    'DASHBOARD_PORT': ('DASHBOARD_PORT', '8080', int),
+}
 
-**Special Offer:** You can explore these professional marketing solutions at a significant discount through this exclusive link:
-{affiliate_link}
+# Every credential / environment key Config reads
+_KNOWN_KEYS = frozenset(key for key, _, _ in _DEFAULTS.values())
 
-This isn't just another marketing tool - it's a complete system designed by experts who understand the HVAC industry inside and out.
+def _snapshot_settings() -> Dict[str, str]:
+    """Merge known environment keys and credentials.txt; file values take precedence"""
+    return {
+        **{key: value for key, value in os.environ.items() if key in _KNOWN_KEYS},
+        **load_credentials_from_file(),
+    }
 
-Benefits you'll see:
-✅ More qualified leads calling your business
-✅ Professional online presence that builds trust
-✅ Automated follow-up systems that convert prospects
-✅ Mobile-optimized designs that capture leads 24/7
+# Taken once at import (and on Config.reload()) so lookups never touch os.environ
+_ENV_SNAPSHOT: Dict[str, str] = _snapshot_settings()
 
-I'm not asking for anything in return - just paying it forward to help fellow business owners succeed. Take a look when you have a moment, and if it seems like a good fit, you can get started right away.
-
-Best regards,
-Marketing Partner
-
-P.S. This special pricing is only available for a limited time, so I'd recommend checking it out soon if you're interested in growing your customer base.
+class _LazyConfigMeta(type):
+    """Resolve settings from _DEFAULTS on first class-level access and cache them"""
+    
+    def __getattr__(cls, name: str) -> Any:
+        try:
+            key, default, convert = _DEFAULTS[name]
+        except KeyError:
+            raise AttributeError(f"type object '{cls.__name__}' has no attribute '{name}'") from None
+        
+        value = convert(get_credential(key, default))
+        setattr(cls, name, value)
+        return value
 
----
-This message was sent to help grow your business. If you'd prefer not to receive similar opportunities, simply reply with "REMOVE" and I'll respect your preference immediately."""
+class Config(metaclass=_LazyConfigMeta):
+    """Application configuration loaded from credentials.txt file"""
+    
+    # Resolved credentials.txt location (None when running from environment only)
+    CREDENTIALS_PATH = _read_credentials("credentials.txt")[0]
+    
+    # Email Templates - Match what email_sender.py expects
+    EMAIL_SUBJECT_TEMPLATE = "Boost Your HVAC Business with Professional Marketing"
+    # Body lives in templates/email_body.txt and is only loaded when an email is rendered
+    EMAIL_TEMPLATE_PATH = Path(__file__).resolve().parents[2] / 'templates' / 'email_body.txt'
     
-    # Validation method
     @classmethod
-    def validate(cls) -> List[str]:
-        """Validate configuration and return list of errors"""
+    @lru_cache(maxsize=None)
+    def get_email_template(cls) -> str:
+        """Load the default email body ({business_name} / {affiliate_link} str.format fields) on first use"""
+        with open(cls.EMAIL_TEMPLATE_PATH, 'r', encoding='utf-8') as f:
+            return f.read().rstrip('\n')
+    
+    # Validation method
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _validate_cached(cls) -> Tuple[str, ...]:
+        # Config is immutable between reloads, so the result is memoized until reload()
         errors = []
         
         if not cls.GOOGLE_PLACES_API_KEY.strip():
@@ -162,12 +219,36 @@ This message was sent to help grow your business. If you'd prefer not to receive
         if not cls.SEARCH_KEYWORDS:
             errors.append("At least one search keyword must be configured")
         
-        return errors
+        return tuple(errors)
+    
+    @classmethod
+    def validate(cls) -> List[str]:
+        """Validate configuration and return list of errors"""
+        return list(cls._validate_cached(cls))
+    
+    @classmethod
+    def reload(cls):
+        """Re-read credentials.txt and the environment and drop all cached settings"""
+        _read_credentials.cache_clear()
+        cls.get_email_template.cache_clear()
+        _ENV_SNAPSHOT.clear()
+        _ENV_SNAPSHOT.update(_snapshot_settings())
+        cls.CREDENTIALS_PATH = _read_credentials("credentials.txt")[0]
+        
+        for name in _DEFAULTS:
+            if name in vars(cls):
+                delattr(cls, name)
+        
+        cls._validate_cached.cache_clear()
+    
+    def __getattr__(self, name: str) -> Any:
+        # Instance access (config.X) falls through to the lazy class lookup
+        return getattr(type(self), name)
     
     @classmethod
     def is_configured(cls) -> bool:
         """Check if basic configuration is complete"""
-        return len(cls.validate()) == 0
+        return not cls._validate_cached(cls)
     
     @classmethod
     def get_database_path(cls) -> str:
@@ -2,13 +2,17 @@
 Database Management for HVAC Email Automation v3
 SQLite database with comprehensive lead tracking and email management
 """
+import os
 import sqlite3
 import logging
-import shutil
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+import atexit
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Dict, Any, Deque, Iterator, Optional, Set, Tuple
 from pathlib import Path
 from contextlib import contextmanager
+from collections import deque
 
 from .config import config
 
@@ -16,11 +20,122 @@ from .config import config
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Per-connection tuning: NORMAL sync is durable under WAL, 256MB mmap, 64MB page cache
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Hot-path statements hoisted to module constants so sqlite3's statement cache hits on every call
+_SQL_INSERT_LEAD = """
+    INSERT INTO leads (
+        business_name, address, phone, website, domain,
+        google_maps_url, category, business_status, scraped_date
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_ENRICH = """
+    INSERT INTO email_enrichment (
+        lead_id, email_address, confidence_score, email_type,
+        sources_count, enriched_date, hunter_credits_used, status, error_message
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_HUNTER_CREDITS = """
+    INSERT INTO hunter_credits (date, credits_used, credits_remaining, operation_type)
+    VALUES (?, ?, ?, ?)
+"""
+
+_SQL_INSERT_SEND = """
+    INSERT INTO email_sends (
+        lead_id, email_address, subject, sent_date, status,
+        response_code, error_message, next_eligible_date, campaign_id
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_GET_LEADS_ENRICH = """
+    SELECT l.* FROM leads l
+    LEFT JOIN email_enrichment e ON l.id = e.lead_id
+    WHERE l.website IS NOT NULL
+    AND l.website != ''
+    AND l.domain IS NOT NULL
+    AND e.id IS NULL
+    AND l.status != 'excluded'
+    ORDER BY l.quality_score DESC, l.scraped_date DESC
+    LIMIT ?
+"""
+
+_SQL_GET_LEADS_SEND = """
+    SELECT l.*, e.email_address, e.confidence_score
+    FROM leads l
+    JOIN email_enrichment e ON l.id = e.lead_id
+    WHERE e.email_address IS NOT NULL
+    AND e.status = 'found'
+    AND l.status != 'excluded'
+    AND NOT EXISTS (
+        SELECT 1 FROM email_sends es
+        WHERE es.lead_id = l.id
+        AND (es.next_eligible_date > ? OR es.sent_date >= ?)
+    )
+    ORDER BY e.confidence_score DESC, l.quality_score DESC
+    LIMIT ?
+"""
+
+# today() re-reads the wall clock at most once per second
+_TODAY_TTL_SECONDS = 1.0
+_today_cache: Tuple[float, Optional[date]] = (0.0, None)
+
+def today() -> date:
+    """Current local date, cached briefly so hot loops don't hit the clock per row"""
+    global _today_cache
+    checked_at, cached = _today_cache
+    now = time.monotonic()
+    if cached is None or now - checked_at > _TODAY_TTL_SECONDS:
+        cached = datetime.now().date()
+        _today_cache = (now, cached)
+    return cached
+
+# Re-run ANALYZE after this many inserted rows so the planner keeps using the composite indexes
+_ANALYZE_EVERY_ROWS = 1000
+
+# log_system_event() flushes once this many records are buffered or this many seconds have passed
+_LOG_FLUSH_SIZE = 100
+_LOG_FLUSH_SECONDS = 5.0
+
+# Dashboard stats don't need per-request freshness; writes through this manager bust the cache
+_STATS_TTL_SECONDS = 15
+
+def _fetch_dicts(cursor: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    """Build dicts straight from tuple rows, skipping the intermediate sqlite3.Row"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
 class DatabaseManager:
     """Enhanced database manager with backup and recovery features"""
     
     def __init__(self):
         self.db_path = config.get_database_path()
+        
+        # One reusable connection per thread, keyed by its owner so connections left behind by
+        # finished worker threads can be closed; close_all() releases the rest
+        self._local = threading.local()
+        self._connections: Dict[sqlite3.Connection, threading.Thread] = {}
+        self._connections_lock = threading.Lock()
+        atexit.register(self.close_all)
+        
+        # (monotonic timestamp, data version, stats) from the last get_dashboard_stats() query
+        self._stats_cache: Optional[Tuple[float, int, Dict[str, Any]]] = None
+        self._data_version = 0
+        self._rows_since_analyze = 0
+        
+        # System log records waiting for the next batched flush
+        self._log_buffer: Deque[Tuple] = deque(maxlen=10000)
+        self._log_lock = threading.Lock()
+        self._log_last_flush = time.monotonic()
+        
         self.ensure_database_exists()
         self.create_tables()
     
@@ -31,20 +146,84 @@ class DatabaseManager:
         
         if not db_file.exists():
             logger.info(f"Creating new database at {self.db_path}")
+        
+        # journal_mode is persisted in the database file, so it only needs setting once
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        finally:
+            conn.close()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open and tune a new connection for the calling thread"""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        
+        with self._connections_lock:
+            # Each scrape/enrich run starts a fresh executor, so reap the previous pool's connections
+            dead = [old for old, owner in self._connections.items() if not owner.is_alive()]
+            for old in dead:
+                del self._connections[old]
+            self._connections[conn] = threading.current_thread()
+        
+        for old in dead:
+            try:
+                old.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing database connection: {e}")
+        return conn
+    
+    def _discard_connection(self, conn: sqlite3.Connection):
+        """Drop a connection that may be in a bad state"""
+        self._local.conn = None
+        with self._connections_lock:
+            self._connections.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
     
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        """Context manager yielding this thread's cached database connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        
         try:
             yield conn
         except Exception as e:
-            conn.rollback()
             logger.error(f"Database error: {e}")
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                self._discard_connection(conn)
+                raise
+            if isinstance(e, sqlite3.Error):
+                self._discard_connection(conn)
             raise
-        finally:
-            conn.close()
+    
+    def close_all(self):
+        """Flush buffered logs and close every cached connection (call on shutdown)"""
+        try:
+            self.flush_logs()
+        except Exception as e:
+            logger.error(f"Failed to flush system logs: {e}")
+        
+        with self._connections_lock:
+            connections, self._connections = list(self._connections), {}
+        
+        for conn in connections:
+            try:
+                # Cheap no-op unless query patterns since open warrant refreshed stats
+                conn.execute("PRAGMA optimize")
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing database connection: {e}")
+        self._local = threading.local()
     
     def create_tables(self):
         """Create all database tables"""
@@ -161,6 +340,15 @@ class DatabaseManager:
                 )
             """)
             
+            # Cached external API responses (zlib-compressed JSON), keyed by request hash
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    query_key TEXT PRIMARY KEY,
+                    response_blob BLOB NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            
             # Create indexes for better performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_domain ON leads(domain)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_status ON leads(status)")
@@ -169,214 +357,315 @@ class DatabaseManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_email_sends_next_eligible ON email_sends(next_eligible_date)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_system_logs_timestamp ON system_logs(timestamp)")
             
+            # Composite indexes covering the get_leads_for_sending joins and ORDER BY
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_enrich_lead_status ON email_enrichment(lead_id, status, email_address, confidence_score)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sends_lead_next ON email_sends(lead_id, next_eligible_date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_sends_lead_date ON email_sends(lead_id, sent_date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_status_qscore ON leads(status, quality_score DESC, scraped_date DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_enrich_status_confidence ON email_enrichment(status, confidence_score DESC)")
+            
+            # Scraper duplicate check by (business_name, phone); domain is covered by idx_leads_domain
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_leads_name_phone ON leads(business_name, phone)")
+            
             conn.commit()
+            
+            # Refresh planner statistics so the composite indexes are picked up
+            cursor.execute("ANALYZE")
             logger.info("Database tables created/verified successfully")
     
+    @staticmethod
+    def _lead_row(lead_data: Dict[str, Any]) -> Tuple:
+        return (
+            lead_data.get('business_name'),
+            lead_data.get('address'),
+            lead_data.get('phone'),
+            lead_data.get('website'),
+            lead_data.get('domain'),
+            lead_data.get('google_maps_url'),
+            lead_data.get('category'),
+            lead_data.get('business_status', 'OPERATIONAL'),
+            lead_data.get('scraped_date', today())
+        )
+    
+    @staticmethod
+    def _enrichment_row(enrichment_data: Dict[str, Any]) -> Tuple:
+        return (
+            enrichment_data.get('lead_id'),
+            enrichment_data.get('email_address'),
+            enrichment_data.get('confidence_score'),
+            enrichment_data.get('email_type'),
+            enrichment_data.get('sources_count', 0),
+            enrichment_data.get('enriched_date', today()),
+            enrichment_data.get('hunter_credits_used', 1),
+            enrichment_data.get('status', 'found'),
+            enrichment_data.get('error_message')
+        )
+    
+    @staticmethod
+    def _send_row(send_data: Dict[str, Any], next_eligible) -> Tuple:
+        return (
+            send_data.get('lead_id'),
+            send_data.get('email_address'),
+            send_data.get('subject'),
+            send_data.get('sent_date', datetime.now()),
+            send_data.get('status'),
+            send_data.get('response_code'),
+            send_data.get('error_message'),
+            next_eligible,
+            send_data.get('campaign_id')
+        )
+    
+    def _after_write(self, conn: sqlite3.Connection, rows: int):
+        """Bust the stats cache and periodically refresh planner statistics"""
+        self._data_version += 1
+        self._rows_since_analyze += rows
+        if self._rows_since_analyze >= _ANALYZE_EVERY_ROWS:
+            self._rows_since_analyze = 0
+            conn.execute("ANALYZE")
+    
     def insert_lead(self, lead_data: Dict[str, Any]) -> int:
         """Insert a new lead"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO leads (
-                    business_name, address, phone, website, domain,
-                    google_maps_url, category, business_status, scraped_date
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                lead_data.get('business_name'),
-                lead_data.get('address'),
-                lead_data.get('phone'),
-                lead_data.get('website'),
-                lead_data.get('domain'),
-                lead_data.get('google_maps_url'),
-                lead_data.get('category'),
-                lead_data.get('business_status', 'OPERATIONAL'),
-                lead_data.get('scraped_date', datetime.now().date())
-            ))
+            cursor = conn.execute(_SQL_INSERT_LEAD, self._lead_row(lead_data))
             
             conn.commit()
+            self._after_write(conn, 1)
             return cursor.lastrowid or 0
     
+    def insert_leads_bulk(self, leads: List[Dict[str, Any]]) -> int:
+        """Insert many leads in a single transaction"""
+        if not leads:
+            return 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.executemany(_SQL_INSERT_LEAD, [self._lead_row(lead_data) for lead_data in leads])
+            
+            conn.commit()
+            self._after_write(conn, cursor.rowcount)
+            return cursor.rowcount
+    
     def insert_email_enrichment(self, enrichment_data: Dict[str, Any]) -> int:
         """Insert email enrichment data"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO email_enrichment (
-                    lead_id, email_address, confidence_score, email_type,
-                    sources_count, enriched_date, hunter_credits_used, status, error_message
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                enrichment_data.get('lead_id'),
-                enrichment_data.get('email_address'),
-                enrichment_data.get('confidence_score'),
-                enrichment_data.get('email_type'),
-                enrichment_data.get('sources_count', 0),
-                enrichment_data.get('enriched_date', datetime.now().date()),
-                enrichment_data.get('hunter_credits_used', 1),
-                enrichment_data.get('status', 'found'),
-                enrichment_data.get('error_message')
-            ))
+            cursor = conn.execute(_SQL_INSERT_ENRICH, self._enrichment_row(enrichment_data))
             
             conn.commit()
+            self._after_write(conn, 1)
             return cursor.lastrowid or 0
     
+    def insert_email_enrichment_bulk(self, enrichments: List[Dict[str, Any]]) -> int:
+        """Insert many email enrichment records in a single transaction"""
+        if not enrichments:
+            return 0
+        
+        with self.get_connection() as conn:
+            cursor = conn.executemany(_SQL_INSERT_ENRICH, [self._enrichment_row(enrichment_data) for enrichment_data in enrichments])
+            
+            conn.commit()
+            self._after_write(conn, cursor.rowcount)
+            return cursor.rowcount
+    
+    def insert_enrichment_results(self, enrichments: List[Dict[str, Any]], credit_rows: List[Tuple]) -> int:
+        """Insert buffered enrichment records and Hunter credit rows in one transaction"""
+        if not enrichments and not credit_rows:
+            return 0
+        
+        with self.get_connection() as conn:
+            if credit_rows:
+                conn.executemany(_SQL_INSERT_HUNTER_CREDITS, credit_rows)
+            conn.executemany(_SQL_INSERT_ENRICH, [self._enrichment_row(enrichment_data) for enrichment_data in enrichments])
+            
+            conn.commit()
+            self._after_write(conn, len(credit_rows) + len(enrichments))
+            return len(enrichments)
+    
     def insert_email_send(self, send_data: Dict[str, Any]) -> int:
         """Insert email send record"""
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            next_eligible = datetime.now().date() + timedelta(days=config.COOLDOWN_DAYS)
+            next_eligible = today() + timedelta(days=config.COOLDOWN_DAYS)
             
-            cursor.execute("""
-                INSERT INTO email_sends (
-                    lead_id, email_address, subject, sent_date, status,
-                    response_code, error_message, next_eligible_date, campaign_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                send_data.get('lead_id'),
-                send_data.get('email_address'),
-                send_data.get('subject'),
-                send_data.get('sent_date', datetime.now()),
-                send_data.get('status'),
-                send_data.get('response_code'),
-                send_data.get('error_message'),
-                next_eligible,
-                send_data.get('campaign_id')
-            ))
+            cursor = conn.execute(_SQL_INSERT_SEND, self._send_row(send_data, next_eligible))
             
             conn.commit()
+            self._after_write(conn, 1)
             return cursor.lastrowid or 0
     
+    def insert_email_send_bulk(self, sends: List[Dict[str, Any]]) -> int:
+        """Insert many email send records in a single transaction"""
+        if not sends:
+            return 0
+        
+        with self.get_connection() as conn:
+            next_eligible = today() + timedelta(days=config.COOLDOWN_DAYS)
+            
+            cursor = conn.executemany(_SQL_INSERT_SEND, [self._send_row(send_data, next_eligible) for send_data in sends])
+            
+            conn.commit()
+            self._after_write(conn, cursor.rowcount)
+            return cursor.rowcount
+    
     def get_leads_for_enrichment(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get leads that need email enrichment"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples; _fetch_dicts builds the dicts
             
-            cursor.execute("""
-                SELECT l.* FROM leads l
-                LEFT JOIN email_enrichment e ON l.id = e.lead_id
-                WHERE l.website IS NOT NULL 
-                AND l.website != ''
-                AND l.domain IS NOT NULL
-                AND e.id IS NULL
-                AND l.status != 'excluded'
-                ORDER BY l.quality_score DESC, l.scraped_date DESC
-                LIMIT ?
-            """, (limit,))
+            cursor.execute(_SQL_GET_LEADS_ENRICH, (limit,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
     
-    def get_leads_for_sending(self, limit: int = 50) -> List[Dict[str, Any]]:
-        """Get leads ready for email sending (with cooldown check)"""
+    def iter_leads_for_enrichment(self, limit: int = 50, batch_size: int = 100) -> Iterator[Dict[str, Any]]:
+        """Yield leads that need email enrichment, fetching batch_size rows at a time"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples; dicts are built per row below
             
-            today = datetime.now().date()
+            cursor.execute(_SQL_GET_LEADS_ENRICH, (limit,))
+            columns = [column[0] for column in cursor.description]
             
-            cursor.execute("""
-                SELECT l.*, e.email_address, e.confidence_score
-                FROM leads l
-                JOIN email_enrichment e ON l.id = e.lead_id
-                LEFT JOIN email_sends es ON l.id = es.lead_id
-                WHERE e.email_address IS NOT NULL
-                AND e.status = 'found'
-                AND l.status != 'excluded'
-                AND (es.id IS NULL OR es.next_eligible_date <= ?)
-                ORDER BY e.confidence_score DESC, l.quality_score DESC
-                LIMIT ?
-            """, (today, limit))
+            while rows := cursor.fetchmany(batch_size):
+                for row in rows:
+                    yield dict(zip(columns, row))
+    
+    def get_email_prefix_counts(self) -> Dict[str, int]:
+        """Count found emails by local part (the text before '@')"""
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT lower(substr(email_address, 1, instr(email_address, '@') - 1)) AS prefix, COUNT(*)
+                FROM email_enrichment
+                WHERE status = 'found' AND instr(email_address, '@') > 1
+                GROUP BY prefix
+            """)
             
-            return [dict(row) for row in cursor.fetchall()]
+            return {prefix: count for prefix, count in cursor.fetchall()}
     
-    def check_email_sent_recently(self, lead_id: int, days: Optional[int] = None) -> bool:
-        """Check if email was sent to lead recently"""
+    def get_leads_for_sending(self, limit: int = 50, days: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get leads ready for email sending (no send still in cooldown or within the last `days` days)"""
         days = days or config.COOLDOWN_DAYS
-        cutoff_date = datetime.now().date() - timedelta(days=days)
         
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples; _fetch_dicts builds the dicts
             
-            cursor.execute("""
-                SELECT COUNT(*) FROM email_sends
+            today_date = today()
+            cutoff_date = today_date - timedelta(days=days)
+            
+            cursor.execute(_SQL_GET_LEADS_SEND, (today_date, cutoff_date, limit))
+            
+            return _fetch_dicts(cursor)
+    
+    def check_email_sent_recently(self, lead_id: int, days: Optional[int] = None) -> bool:
+        """Check if email was sent to lead recently"""
+        days = days or config.COOLDOWN_DAYS
+        cutoff_date = today() - timedelta(days=days)
+        
+        with self.get_connection() as conn:
+            # Stop at the first matching send instead of counting them all
+            cursor = conn.execute("""
+                SELECT 1 FROM email_sends
                 WHERE lead_id = ? AND sent_date >= ?
+                LIMIT 1
             """, (lead_id, cutoff_date))
             
-            result = cursor.fetchone()
-            return (result[0] if result else 0) > 0
+            return cursor.fetchone() is not None
     
-    def get_dashboard_stats(self) -> Dict[str, Any]:
-        """Get statistics for dashboard"""
+    def get_lead_dedup_keys(self) -> Tuple[Set[str], Set[Tuple[str, str]]]:
+        """Return the domains and (business_name, phone) pairs of all non-excluded leads"""
+        seen_domains: Set[str] = set()
+        seen_name_phone: Set[Tuple[str, str]] = set()
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples
             
-            # Total leads
-            cursor.execute("SELECT COUNT(*) FROM leads")
-            total_leads = cursor.fetchone()[0]
-            
-            # Leads with emails
-            cursor.execute("""
-                SELECT COUNT(*) FROM leads l
-                JOIN email_enrichment e ON l.id = e.lead_id
-                WHERE e.email_address IS NOT NULL
-            """)
-            leads_with_emails = cursor.fetchone()[0]
+            cursor.execute("SELECT domain, business_name, phone FROM leads WHERE status != 'excluded'")
             
-            # Emails sent today
-            today = datetime.now().date()
-            cursor.execute("""
-                SELECT COUNT(*) FROM email_sends
-                WHERE DATE(sent_date) = ?
-            """, (today,))
-            emails_sent_today = cursor.fetchone()[0]
-            
-            # Emails sent this week
-            week_ago = today - timedelta(days=7)
-            cursor.execute("""
-                SELECT COUNT(*) FROM email_sends
-                WHERE DATE(sent_date) >= ?
-            """, (week_ago,))
-            emails_sent_week = cursor.fetchone()[0]
+            for domain, business_name, phone in cursor:
+                if domain:
+                    seen_domains.add(domain)
+                if business_name and phone:
+                    seen_name_phone.add((business_name, phone))
+        
+        return seen_domains, seen_name_phone
+    
+    def get_dashboard_stats(self) -> Dict[str, Any]:
+        """Get statistics for dashboard (cached for a short TTL)"""
+        cached = self._stats_cache
+        if (cached is not None and cached[1] == self._data_version
+                and time.monotonic() - cached[0] < _STATS_TTL_SECONDS):
+            return dict(cached[2])
+        
+        version = self._data_version
+        
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
             
-            # Hunter credits used today
-            cursor.execute("""
-                SELECT COALESCE(SUM(credits_used), 0) FROM hunter_credits
-                WHERE date = ?
-            """, (today,))
-            credits_used_today = cursor.fetchone()[0]
+            today_date = today()
+            week_ago = today_date - timedelta(days=7)
             
-            # Success rate
+            # All counters in one statement; send counters share a single pass over email_sends
             cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN status = 'sent' THEN 1 ELSE 0 END) as successful
+                SELECT
+                    (SELECT COUNT(*) FROM leads) AS total_leads,
+                    (SELECT COUNT(*) FROM leads l
+                     JOIN email_enrichment e ON l.id = e.lead_id
+                     WHERE e.email_address IS NOT NULL) AS leads_with_emails,
+                    (SELECT COALESCE(SUM(credits_used), 0) FROM hunter_credits
+                     WHERE date = ?) AS credits_used_today,
+                    COALESCE(SUM(CASE WHEN DATE(sent_date) = ? THEN 1 ELSE 0 END), 0) AS emails_sent_today,
+                    COUNT(*) AS emails_sent_week,
+                    COALESCE(SUM(CASE WHEN status = 'sent' THEN 1 ELSE 0 END), 0) AS successful_week
                 FROM email_sends
                 WHERE DATE(sent_date) >= ?
-            """, (week_ago,))
+            """, (today_date, today_date, week_ago))
             
-            result = cursor.fetchone()
-            success_rate = (result[1] / result[0] * 100) if result[0] > 0 else 0
+            row = cursor.fetchone()
+            total_leads = row['total_leads']
+            leads_with_emails = row['leads_with_emails']
+            emails_sent_week = row['emails_sent_week']
+            success_rate = (row['successful_week'] / emails_sent_week * 100) if emails_sent_week > 0 else 0
             
-            return {
+            stats = {
                 'total_leads': total_leads,
                 'leads_with_emails': leads_with_emails,
-                'emails_sent_today': emails_sent_today,
+                'emails_sent_today': row['emails_sent_today'],
                 'emails_sent_week': emails_sent_week,
-                'credits_used_today': credits_used_today,
+                'credits_used_today': row['credits_used_today'],
                 'success_rate': round(success_rate, 1),
                 'leads_pending_enrichment': total_leads - leads_with_emails
             }
+        
+        self._stats_cache = (time.monotonic(), version, stats)
+        return dict(stats)
     
     def log_system_event(self, level: str, module: str, message: str, details: Optional[str] = None):
-        """Log system event"""
+        """Log system event (buffered; written in batches by flush_logs)"""
+        # Stamp now in CURRENT_TIMESTAMP's UTC format so a delayed flush keeps the event time
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        
+        with self._log_lock:
+            self._log_buffer.append((timestamp, level, module, message, details))
+            due = (len(self._log_buffer) >= _LOG_FLUSH_SIZE
+                   or time.monotonic() - self._log_last_flush >= _LOG_FLUSH_SECONDS)
+        
+        if due:
+            self.flush_logs()
+    
+    def flush_logs(self):
+        """Write buffered system log records in a single transaction"""
+        with self._log_lock:
+            records = list(self._log_buffer)
+            self._log_buffer.clear()
+            self._log_last_flush = time.monotonic()
+        
+        if not records:
+            return
+        
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT INTO system_logs (level, module, message, details)
-                VALUES (?, ?, ?, ?)
-            """, (level, module, message, details))
+            conn.executemany("""
+                INSERT INTO system_logs (timestamp, level, module, message, details)
+                VALUES (?, ?, ?, ?, ?)
+            """, records)
             
             conn.commit()
     
@@ -388,7 +677,13 @@ class DatabaseManager:
         backup_path = str(Path(backup_dir) / backup_filename)
         
         try:
-            shutil.copy2(self.db_path, backup_path)
+            # Online backup copies pages under a read lock, so it is safe while writers are active
+            with self.get_connection() as src:
+                dst = sqlite3.connect(backup_path)
+                try:
+                    src.backup(dst, pages=1024)
+                finally:
+                    dst.close()
             logger.info(f"Database backed up to {backup_path}")
             
             # Log backup event
@@ -401,21 +696,51 @@ class DatabaseManager:
     
     def cleanup_old_backups(self):
         """Remove old backup files"""
-        backup_dir = Path(config.BACKUP_DIR)
-        cutoff_date = datetime.now() - timedelta(days=config.BACKUP_RETENTION_DAYS)
+        backup_dir = config.BACKUP_DIR
+        cutoff = (datetime.now() - timedelta(days=config.BACKUP_RETENTION_DAYS)).timestamp()
         
-        for backup_file in backup_dir.glob("automation_backup_*.db"):
-            if backup_file.stat().st_mtime < cutoff_date.timestamp():
+        if not os.path.isdir(backup_dir):
+            return
+        
+        # DirEntry carries the directory read's metadata, avoiding a separate stat per match
+        with os.scandir(backup_dir) as entries:
+            for entry in entries:
+                if not (entry.name.startswith("automation_backup_") and entry.name.endswith(".db")):
+                    continue
+                
                 try:
-                    backup_file.unlink()
-                    logger.info(f"Removed old backup: {backup_file.name}")
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                        logger.info(f"Removed old backup: {entry.name}")
                 except Exception as e:
-                    logger.error(f"Failed to remove old backup {backup_file.name}: {e}")
+                    logger.error(f"Failed to remove old backup {entry.name}: {e}")
+    
+    def get_cached_response(self, query_key: str, max_age_seconds: float) -> Optional[bytes]:
+        """Return a cached API response blob if it is younger than max_age_seconds"""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT response_blob FROM api_cache WHERE query_key = ? AND fetched_at > ?",
+                (query_key, time.time() - max_age_seconds)
+            ).fetchone()
+            
+            return row[0] if row else None
+    
+    def cache_response(self, query_key: str, response_blob: bytes):
+        """Store (or refresh) a cached API response blob"""
+        with self.get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO api_cache (query_key, response_blob, fetched_at) VALUES (?, ?, ?)",
+                (query_key, response_blob, time.time())
+            )
+            conn.commit()
     
     def get_recent_logs(self, limit: int = 100) -> List[Dict[str, Any]]:
         """Get recent system logs"""
+        self.flush_logs()
+        
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.row_factory = None  # plain tuples; _fetch_dicts builds the dicts
             
             cursor.execute("""
                 SELECT * FROM system_logs
@@ -423,7 +748,7 @@ class DatabaseManager:
                 LIMIT ?
             """, (limit,))
             
-            return [dict(row) for row in cursor.fetchall()]
+            return _fetch_dicts(cursor)
 
 # Global database instance
 db = DatabaseManager()
@@ -0,0 +1,38 @@
+"""
+HVAC Email Automation v3.0 - Rate limiting
+Thread-safe request pacing shared by the API clients
+"""
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests per second with bursts of up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available and take it"""
+        # Waiting while holding the lock queues workers in arrival order
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            
+            if self._tokens < 1:
+                time.sleep((1 - self._tokens) / self.rate)
+                self._tokens = 1.0
+                self._updated = time.monotonic()
+            
+            self._tokens -= 1
+    
+    def slow_down(self, min_rate: float = 0.5):
+        """Halve the rate and drop any saved-up burst after the API pushes back"""
+        with self._lock:
+            self.rate = max(min_rate, self.rate / 2)
+            self._tokens = 0.0
+            self._updated = time.monotonic()
@@ -4,20 +4,99 @@ Hunter.io integration with credit optimization and intelligent email discovery
 """
 import requests
 import time
+import random
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+import threading
+from collections import deque
+from datetime import date, datetime
+from typing import List, Dict, Any, Deque, Optional, Tuple
 import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from itertools import islice
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from ..core.config import config
 from ..core.database import db
 
+# dnspython is optional; without it the MX pre-check is skipped
+try:
+    import dns.exception
+    import dns.resolver
+    DNS_AVAILABLE = True
+except ImportError:
+    DNS_AVAILABLE = False
+
+# orjson parses Hunter payloads several times faster; stdlib json is the fallback
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
 # Configure logging
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Compiled once at import; validate_email runs for every domain-search result
+_EMAIL_RE = re.compile(r'^[a-z0-9._%+-]+@[a-z0-9.-]+\.[a-z]{2,}$', re.IGNORECASE)
+_CLEAN_RE = re.compile(r'[^a-zA-Z0-9\s]')
+
+# How long a Hunter /account credit count is reused before asking again
+_CREDITS_TTL_SECONDS = 60
+
+# Upper bound on per-run domain_search / email_verifier memo entries
+_LOOKUP_CACHE_SIZE = 1000
+
+# Conservative Hunter credit budget for one enrich_leads run, and the most find_best_email
+# can spend on a single lead (a domain search plus up to three finder calls)
+_RUN_CREDIT_LIMIT = 40
+_MAX_CREDITS_PER_LEAD = 4
+
+# MX answers are reused for this long, across enricher instances in the same process
+_MX_TTL_SECONDS = 300
+_mx_cache: Dict[str, Tuple[bool, float]] = {}
+_mx_lock = threading.Lock()
+
+def _has_mx(domain: str) -> bool:
+    """Return False only when DNS says the domain cannot receive mail"""
+    if not DNS_AVAILABLE:
+        return True
+
+    now = time.monotonic()
+    cached = _mx_cache.get(domain)
+    if cached is not None and now - cached[1] < _MX_TTL_SECONDS:
+        return cached[0]
+
+    try:
+        has_mx = bool(dns.resolver.resolve(domain, 'MX', lifetime=2.0))
+    except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+        has_mx = False
+    except dns.exception.DNSException as e:
+        # Timeouts and SERVFAIL say nothing about the domain, so don't skip it
+        logger.debug("MX lookup failed for %s: %s", domain, e)
+        return True
+
+    with _mx_lock:
+        if len(_mx_cache) >= _LOOKUP_CACHE_SIZE:
+            _mx_cache.pop(next(iter(_mx_cache)), None)
+        _mx_cache[domain] = (has_mx, now)
+    return has_mx
+
+def _parse(response) -> Dict[str, Any]:
+    """Decode a Hunter JSON response body"""
+    return _loads(response.content)
+
+def _retry_after_delay(response, attempt: int) -> float:
+    """Back-off after a 429: Retry-After (or 2s) doubled per repeat hit, clamped to 1-60s, plus jitter"""
+    try:
+        base = float(response.headers.get('Retry-After', 0)) or 2.0
+    except (TypeError, ValueError):
+        base = 2.0  # HTTP-date form or garbage
+    return min(60.0, max(1.0, base * 2 ** min(attempt, 6))) + random.uniform(0, 1.0)
+
 class EmailEnricher:
     """Enhanced email enricher with Hunter.io optimization"""
 
@@ -46,6 +125,13 @@ class EmailEnricher:
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
 
+        # Endpoint URLs and the bound get are resolved once, not per request
+        self._url_account = f"{self.base_url}/account"
+        self._url_domain_search = f"{self.base_url}/domain-search"
+        self._url_email_finder = f"{self.base_url}/email-finder"
+        self._url_email_verifier = f"{self.base_url}/email-verifier"
+        self._get = self.session.get
+
         # Set headers and timeouts
         self.session.headers.update({
             'User-Agent': 'HVAC-Automation/3.0',
@@ -56,41 +142,75 @@ class EmailEnricher:
         # Timeout settings (connect_timeout, read_timeout)
         self.timeout = (10, 30)  # 10s to connect, 30s to read
 
-        # Email patterns for validation
-        self.email_patterns = [
-            r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        ]
-
         # Common business email prefixes (in order of preference)
-        self.preferred_prefixes = [
+        self.preferred_prefixes = (
             'info', 'contact', 'sales', 'service', 'office',
             'admin', 'support', 'hello', 'mail', 'business'
-        ]
+        )
+        self._preferred_set = frozenset(self.preferred_prefixes)
+
+        # How often each local part has been the found address; generated
+        # candidates are tried most-successful first
+        try:
+            self._prefix_hits: Dict[str, int] = db.get_email_prefix_counts()
+        except Exception as e:
+            logger.warning(f"Could not load email prefix history: {e}")
+            self._prefix_hits = {}
+
+        # Enrichment results and Hunter usage are buffered and written by _flush
+        self._enrich_buf: List[Dict[str, Any]] = []
+        self._credit_buf: List[Tuple] = []
+        self._run_date: Optional[date] = None  # set by enrich_leads for the duration of a run
+
+        # (credits, monotonic timestamp) of the last successful /account lookup
+        self._credits_cache: Tuple[Optional[int], float] = (None, 0.0)
+
+        # Successful lookups are reused so leads sharing a domain spend one credit
+        self._domain_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._verify_cache: Dict[str, Tuple[bool, int]] = {}
+
+        # Workers share the caches above; a per-key lock makes same-domain leads in one
+        # wave wait for the first lookup instead of each paying for it
+        self._cache_lock = threading.Lock()
+        self._lookup_locks: Dict[str, threading.Lock] = {}
+
+        # Client-side penalty window after a Hunter 429, shared by all workers
+        self._rate_limited_until = 0.0
+        self._rate_limit_hits = 0
+
+        # Start times of the last HUNTER_REQUESTS_PER_MINUTE requests; a new
+        # request waits only if it would push the rolling minute over quota
+        self._recent: Deque[float] = deque(maxlen=max(1, config.HUNTER_REQUESTS_PER_MINUTE))
+        self._admission_lock = threading.Lock()
 
     def validate_email(self, email: str) -> bool:
         """Validate email format"""
-        if not email or '@' not in email:
+        # Cheap string checks reject obvious junk before the regex runs
+        if not email or '@' not in email or '.' not in email.rpartition('@')[2]:
             return False
-
-        for pattern in self.email_patterns:
-            if re.match(pattern, email.lower()):
-                return True
-
-        return False
+        return _EMAIL_RE.match(email) is not None
 
     def get_hunter_credits(self) -> Optional[int]:
         """Get remaining Hunter.io credits with enhanced error handling"""
+        now = time.monotonic()
+        credits, fetched_at = self._credits_cache
+        if credits is not None and now - fetched_at < _CREDITS_TTL_SECONDS:
+            return credits
+
         try:
             logger.debug("Checking Hunter.io credits...")
-            response = self.session.get(
-                f"{self.base_url}/account",
+            response = self._get(
+                self._url_account,
                 params={'api_key': self.api_key},
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                data = response.json()
-                return data.get('data', {}).get('requests', {}).get('searches', {}).get('available', 0)
+                self._rate_limit_hits = 0
+                data = _parse(response)
+                credits = data.get('data', {}).get('requests', {}).get('searches', {}).get('available', 0)
+                self._credits_cache = (credits, now)
+                return credits
             else:
                 logger.warning(f"Failed to get Hunter credits: {response.status_code}")
                 return None
@@ -99,26 +219,100 @@ class EmailEnricher:
             logger.error(f"Error getting Hunter credits: {e}")
             return None
 
-    def log_hunter_usage(self, credits_used: int, operation_type: str):
-        """Log Hunter.io credit usage"""
+    def log_hunter_usage(self, credits_used: int, operation_type: str, when: Optional[date] = None):
+        """Buffer Hunter.io credit usage; credits_remaining is filled in by _flush"""
+        when = when or self._run_date or datetime.now().date()
+        self._credit_buf.append((when, credits_used, None, operation_type))
+
+    def _flush(self):
+        """Write buffered enrichment results and Hunter usage in one transaction"""
+        enrichments, self._enrich_buf = self._enrich_buf, []
+        credit_rows, self._credit_buf = self._credit_buf, []
+
+        if not enrichments and not credit_rows:
+            return
+
+        # Keep the candidate ordering in step with what was just found
+        for enrichment in enrichments:
+            email = enrichment.get('email_address')
+            if email:
+                prefix = email.partition('@')[0].lower()  # same key as get_email_prefix_counts
+                self._prefix_hits[prefix] = self._prefix_hits.get(prefix, 0) + 1
+
         try:
-            remaining_credits = self.get_hunter_credits()
+            if credit_rows:
+                remaining_credits = self.get_hunter_credits()
+                credit_rows = [(day, used, remaining_credits, operation) for day, used, _, operation in credit_rows]
 
-            with db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO hunter_credits (date, credits_used, credits_remaining, operation_type)
-                    VALUES (?, ?, ?, ?)
-                """, (datetime.now().date(), credits_used, remaining_credits, operation_type))
-                conn.commit()
+            db.insert_enrichment_results(enrichments, credit_rows)
 
         except Exception as e:
-            logger.error(f"Error logging Hunter usage: {e}")
+            logger.error(f"Error saving enrichment results: {e}")
+
+    def _note_rate_limit(self, response) -> float:
+        """Open (or extend) the penalty window after a 429 and return its length"""
+        delay = _retry_after_delay(response, self._rate_limit_hits)
+        self._rate_limit_hits += 1
+        self._rate_limited_until = max(self._rate_limited_until, time.monotonic() + delay)
+        return delay
+
+    def _wait_for_rate_limit(self):
+        """Hold off new Hunter requests until the current penalty window has passed"""
+        remaining = self._rate_limited_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def _admit(self):
+        """Block until a Hunter request fits both the 429 penalty window and the per-minute quota"""
+        self._wait_for_rate_limit()
+
+        # Waiting while holding the lock queues workers in arrival order
+        with self._admission_lock:
+            recent = self._recent
+            if len(recent) == recent.maxlen:
+                wait = 60.0 - (time.monotonic() - recent[0])
+                if wait > 0:
+                    logger.debug("Hunter per-minute quota reached, waiting %.1fs", wait)
+                    time.sleep(wait)
+            recent.append(time.monotonic())
+
+    def _remember(self, cache: Dict, key: str, value: Any):
+        """Store a lookup result, evicting the oldest entry once the cache is full"""
+        with self._cache_lock:
+            if len(cache) >= _LOOKUP_CACHE_SIZE:
+                cache.pop(next(iter(cache)), None)
+            cache[key] = value
+
+    def _lookup_lock(self, key: str) -> threading.Lock:
+        """Lock held while one worker runs the paid lookup for key"""
+        with self._cache_lock:
+            lock = self._lookup_locks.get(key)
+            if lock is None:
+                if len(self._lookup_locks) >= _LOOKUP_CACHE_SIZE:
+                    self._lookup_locks.pop(next(iter(self._lookup_locks)), None)
+                lock = self._lookup_locks[key] = threading.Lock()
+            return lock
 
     def domain_search(self, domain: str) -> Tuple[List[Dict[str, Any]], int]:
         """Search for emails on a domain using Hunter.io with enhanced error handling"""
+        cached = self._domain_cache.get(domain)
+        if cached is not None:
+            logger.debug("Using cached domain search for %s", domain)
+            return cached, 0
+
+        with self._lookup_lock(domain):
+            return self._domain_search(domain)
+
+    def _domain_search(self, domain: str) -> Tuple[List[Dict[str, Any]], int]:
+        """Uncached Hunter domain search; re-checks the cache a concurrent worker may have filled"""
+        cached = self._domain_cache.get(domain)
+        if cached is not None:
+            logger.debug("Using cached domain search for %s", domain)
+            return cached, 0
+
         try:
-            logger.debug(f"Searching domain: {domain}")
+            logger.debug("Searching domain: %s", domain)
+            self._admit()
             params = {
                 'domain': domain,
                 'api_key': self.api_key,
@@ -126,24 +320,26 @@ class EmailEnricher:
                 'type': 'generic'  # Focus on generic emails
             }
 
-            response = self.session.get(
-                f"{self.base_url}/domain-search",
+            response = self._get(
+                self._url_domain_search,
                 params=params,
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                data = response.json()
+                self._rate_limit_hits = 0
+                data = _parse(response)
                 emails = data.get('data', {}).get('emails', [])
 
                 # Log credit usage
                 self.log_hunter_usage(1, 'domain_search')
+                self._remember(self._domain_cache, domain, emails)
 
                 return emails, 1
 
             elif response.status_code == 429:
-                logger.warning(f"Hunter.io rate limit hit for domain: {domain}")
-                time.sleep(60)  # Wait 1 minute
+                delay = self._note_rate_limit(response)
+                logger.warning(f"Hunter.io rate limit hit for domain: {domain} (backing off {delay:.1f}s)")
                 return [], 0
 
             else:
@@ -157,7 +353,8 @@ class EmailEnricher:
     def email_finder(self, domain: str, first_name: Optional[str] = None, last_name: Optional[str] = None) -> Tuple[Optional[str], int, int]:
         """Find specific email using Hunter.io email finder with enhanced error handling"""
         try:
-            logger.debug(f"Finding email for {first_name or 'generic'} at {domain}")
+            logger.debug("Finding email for %s at %s", first_name or 'generic', domain)
+            self._admit()
             params = {
                 'domain': domain,
                 'api_key': self.api_key
@@ -168,14 +365,15 @@ class EmailEnricher:
             if last_name:
                 params['last_name'] = last_name
 
-            response = self.session.get(
-                f"{self.base_url}/email-finder",
+            response = self._get(
+                self._url_email_finder,
                 params=params,
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                data = response.json()
+                self._rate_limit_hits = 0
+                data = _parse(response)
                 email_data = data.get('data', {})
                 email = email_data.get('email')
                 confidence = email_data.get('confidence', 0)
@@ -186,8 +384,8 @@ class EmailEnricher:
                 return email, confidence, 1
 
             elif response.status_code == 429:
-                logger.warning(f"Hunter.io rate limit hit for email finder: {domain}")
-                time.sleep(60)
+                delay = self._note_rate_limit(response)
+                logger.warning(f"Hunter.io rate limit hit for email finder: {domain} (backing off {delay:.1f}s)")
                 return None, 0, 0
 
             else:
@@ -200,21 +398,36 @@ class EmailEnricher:
 
     def email_verifier(self, email: str) -> Tuple[bool, int, int]:
         """Verify email using Hunter.io with enhanced error handling"""
+        cached = self._verify_cache.get(email)
+        if cached is not None:
+            return cached[0], cached[1], 0
+
+        with self._lookup_lock(email):
+            return self._email_verifier(email)
+
+    def _email_verifier(self, email: str) -> Tuple[bool, int, int]:
+        """Uncached Hunter verification; re-checks the cache a concurrent worker may have filled"""
+        cached = self._verify_cache.get(email)
+        if cached is not None:
+            return cached[0], cached[1], 0
+
         try:
-            logger.debug(f"Verifying email: {email}")
+            logger.debug("Verifying email: %s", email)
+            self._admit()
             params = {
                 'email': email,
                 'api_key': self.api_key
             }
 
-            response = self.session.get(
-                f"{self.base_url}/email-verifier",
+            response = self._get(
+                self._url_email_verifier,
                 params=params,
                 timeout=self.timeout
             )
 
             if response.status_code == 200:
-                data = response.json()
+                self._rate_limit_hits = 0
+                data = _parse(response)
                 result = data.get('data', {}).get('result', 'undeliverable')
 
                 # Log credit usage
@@ -223,9 +436,15 @@ class EmailEnricher:
                 # Consider deliverable and risky as valid
                 is_valid = result in ['deliverable', 'risky']
                 confidence = 90 if result == 'deliverable' else 60 if result == 'risky' else 10
+                self._remember(self._verify_cache, email, (is_valid, confidence))
 
                 return is_valid, confidence, 1
 
+            elif response.status_code == 429:
+                delay = self._note_rate_limit(response)
+                logger.warning(f"Hunter.io rate limit hit for email verifier: {email} (backing off {delay:.1f}s)")
+                return False, 0, 0
+
             else:
                 logger.warning(f"Hunter email verifier failed for {email}: {response.status_code}")
                 return False, 0, 0
@@ -239,7 +458,7 @@ class EmailEnricher:
         emails = []
 
         # Clean business name for email generation
-        clean_name = re.sub(r'[^a-zA-Z0-9\s]', '', business_name.lower())
+        clean_name = _CLEAN_RE.sub('', business_name.lower())
         words = clean_name.split()
 
         # Standard generic emails
@@ -255,6 +474,11 @@ class EmailEnricher:
                 f"contact{first_word}@{domain}"
             ])
 
+        # Historically successful prefixes first; sort is stable so ties keep preference order
+        prefix_hits = self._prefix_hits
+        if prefix_hits:
+            emails.sort(key=lambda email: -prefix_hits.get(email.partition('@')[0], 0))
+
         return emails[:5]  # Limit to 5 attempts
 
     def find_best_email(self, lead_data: Dict[str, Any]) -> Tuple[Optional[str], int, str, int]:
@@ -266,19 +490,24 @@ class EmailEnricher:
         if not domain:
             return None, 0, 'no_domain', 0
 
-        logger.debug(f"Finding email for {business_name} ({domain})")
+        logger.debug("Finding email for %s (%s)", business_name, domain)
 
         # Strategy 1: Domain search to find existing emails
         try:
             emails, used = self.domain_search(domain)
             credits_used += used
 
+            # Hunter's own confidence for every valid address it already reported
+            observed: Dict[str, int] = {}
+
             if emails:
                 # Sort by confidence and preference
                 best_email = None
                 best_confidence = 0
 
-                for email_data in emails:
+                # Hunter doesn't order results; look at the strongest first so a
+                # clear winner ends the scan (sorted copy, the list may be cached)
+                for email_data in sorted(emails, key=lambda item: -(item.get('confidence') or 0)):
                     email = email_data.get('value', '').lower()
                     confidence = email_data.get('confidence', 0)
                     email_type = email_data.get('type', '')
@@ -286,23 +515,34 @@ class EmailEnricher:
                     if not self.validate_email(email):
                         continue
 
+                    observed[email] = confidence
+
                     # Prefer generic emails over personal ones
                     if email_type == 'generic':
                         confidence += 10
 
                     # Prefer emails with preferred prefixes
                     email_prefix = email.split('@')[0]
-                    if any(prefix in email_prefix for prefix in self.preferred_prefixes):
+                    if email_prefix in self._preferred_set or email_prefix.startswith(self.preferred_prefixes):
                         confidence += 15
 
+                    if confidence >= 75 and email_type == 'generic':
+                        logger.debug("Found email via domain search: %s (confidence: %s)", email, confidence)
+                        return email, confidence, 'domain_search_fast', credits_used
+
                     if confidence > best_confidence:
                         best_email = email
                         best_confidence = confidence
 
                 if best_email and best_confidence >= 50:
-                    logger.debug(f"Found email via domain search: {best_email} (confidence: {best_confidence})")
+                    logger.debug("Found email via domain search: %s (confidence: %s)", best_email, best_confidence)
                     return best_email, best_confidence, 'domain_search', credits_used
 
+            # Nothing below can succeed for a domain that does not accept mail
+            if not _has_mx(domain):
+                logger.debug("No MX record for %s, skipping verification", domain)
+                return None, 0, 'no_mx', credits_used
+
             # Strategy 2: Try common email patterns
             common_emails = self.generate_common_emails(domain, business_name)
 
@@ -310,16 +550,22 @@ class EmailEnricher:
                 if credits_used >= 3:  # Limit credit usage per lead
                     break
 
+                # Generated and reported by domain search: accept on the combined
+                # signal, never pay to verify an address Hunter already returned
+                if email in observed:
+                    combined_confidence = observed[email] + 20
+                    if combined_confidence >= 50:
+                        logger.debug("Found email via cross-confirmation: %s (confidence: %s)", email, combined_confidence)
+                        return email, combined_confidence, 'cross_confirmed', credits_used
+                    continue
+
                 is_valid, confidence, used = self.email_verifier(email)
                 credits_used += used
 
                 if is_valid and confidence >= 60:
-                    logger.debug(f"Found email via pattern: {email} (confidence: {confidence})")
+                    logger.debug("Found email via pattern: %s (confidence: %s)", email, confidence)
                     return email, confidence, 'pattern_verified', credits_used
 
-                # Small delay between verifications
-                time.sleep(0.5)
-
             # Strategy 3: Email finder with common names
             if credits_used < 2:
                 common_names = [
@@ -335,7 +581,7 @@ class EmailEnricher:
                     credits_used += used
 
                     if email and confidence >= 70:
-                        logger.debug(f"Found email via finder: {email} (confidence: {confidence})")
+                        logger.debug("Found email via finder: %s (confidence: %s)", email, confidence)
                         return email, confidence, 'email_finder', credits_used
 
             return None, 0, 'not_found', credits_used
@@ -350,6 +596,7 @@ class EmailEnricher:
         logger.info(f"🔍 Starting email enrichment (limit: {limit})...")
 
         start_time = datetime.now()
+        run_date = self._run_date = start_time.date()
         total_processed = 0
         total_found = 0
         total_credits_used = 0
@@ -361,54 +608,70 @@ class EmailEnricher:
             if available_credits is not None and available_credits < 10:
                 logger.warning(f"Low Hunter.io credits: {available_credits}")
 
-            # Get leads that need enrichment
-            leads = db.get_leads_for_enrichment(limit)
-            logger.info(f"Found {len(leads)} leads to enrich")
-
-            for lead in leads:
-                try:
-                    total_processed += 1
-                    lead_id = lead['id']
-
-                    logger.debug(f"Processing lead {total_processed}/{len(leads)}: {lead['business_name']}")
-
-                    # Find best email
-                    email, confidence, method, credits_used = self.find_best_email(lead)
-                    total_credits_used += credits_used
-
-                    # Save enrichment result
-                    enrichment_data = {
-                        'lead_id': lead_id,
-                        'email_address': email,
-                        'confidence_score': confidence,
-                        'email_type': 'generic' if email else None,
-                        'sources_count': 1 if email else 0,
-                        'enriched_date': datetime.now().date(),
-                        'hunter_credits_used': credits_used,
-                        'status': 'found' if email else 'not_found',
-                        'error_message': None if email else f'No email found using {method}'
-                    }
-
-                    db.insert_email_enrichment(enrichment_data)
-
-                    if email:
-                        total_found += 1
-                        logger.debug(f"✅ Found email: {email} (confidence: {confidence})")
-                    else:
-                        logger.debug(f"❌ No email found for {lead['business_name']}")
-
-                    # Respectful delay between requests
-                    time.sleep(config.THROTTLE_DELAY)
-
-                    # Check if we're running low on credits
-                    if total_credits_used >= 40:  # Conservative limit
+            # Leads are I/O bound on Hunter round-trips, so look them up in
+            # waves of HUNTER_CONCURRENCY and record results in lead order.
+            # Leads are streamed from the database, so the first wave starts
+            # as soon as its rows arrive.
+            workers = max(1, config.HUNTER_CONCURRENCY)
+
+            with closing(db.iter_leads_for_enrichment(limit)) as leads, \
+                    ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hunter') as executor:
+                while True:
+                    # Never dispatch more leads than the remaining budget covers at their
+                    # worst case, so a wave can't overshoot the cap
+                    budget = (_RUN_CREDIT_LIMIT - total_credits_used) // _MAX_CREDITS_PER_LEAD
+                    if budget <= 0:
                         logger.warning("Approaching Hunter.io credit limit, stopping enrichment")
                         break
 
-                except Exception as e:
-                    error_msg = f"Error processing lead {lead.get('business_name', 'unknown')}: {str(e)}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+                    wave = list(islice(leads, min(workers, budget)))
+                    if not wave:
+                        break
+
+                    futures = [executor.submit(self.find_best_email, lead) for lead in wave]
+
+                    for lead, future in zip(wave, futures):
+                        try:
+                            total_processed += 1
+                            lead_id = lead['id']
+
+                            logger.debug("Processing lead %d: %s", total_processed, lead['business_name'])
+
+                            # Find best email
+                            email, confidence, method, credits_used = future.result()
+                            total_credits_used += credits_used
+
+                            # Save enrichment result
+                            enrichment_data = {
+                                'lead_id': lead_id,
+                                'email_address': email,
+                                'confidence_score': confidence,
+                                'email_type': 'generic' if email else None,
+                                'sources_count': 1 if email else 0,
+                                'enriched_date': run_date,
+                                'hunter_credits_used': credits_used,
+                                'status': 'found' if email else 'not_found',
+                                'error_message': None if email else f'No email found using {method}'
+                            }
+
+                            self._enrich_buf.append(enrichment_data)
+
+                            if email:
+                                total_found += 1
+                                logger.debug("✅ Found email: %s (confidence: %s)", email, confidence)
+                            else:
+                                logger.debug("❌ No email found for %s", lead['business_name'])
+
+                        except Exception as e:
+                            error_msg = f"Error processing lead {lead.get('business_name', 'unknown')}: {str(e)}"
+                            logger.error(error_msg)
+                            errors.append(error_msg)
+
+                    # Save results every 50 leads so a crash loses little work
+                    if len(self._enrich_buf) >= 50:
+                        self._flush()
+
+            self._flush()
 
             # Calculate duration
             duration = datetime.now() - start_time
@@ -439,6 +702,9 @@ class EmailEnricher:
             error_msg = f"Email enrichment failed: {str(e)}"
             logger.error(error_msg)
 
+            # Keep whatever was enriched before the failure
+            self._flush()
+
             db.log_system_event('ERROR', 'enricher', error_msg, None)
 
             return {
@@ -3,20 +3,109 @@ Enhanced HVAC Lead Scraper v3
 Advanced lead scraping with quality scoring, deduplication, and database integration
 """
 import requests
+import hashlib
+import json
+import math
 import time
+import zlib
 import logging
-from datetime import datetime
-from typing import List, Dict, Any, Optional
-from urllib.parse import urlparse
-import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 
 from ..core.config import config
 from ..core.database import db
+from ..core.rate_limit import TokenBucket
 
 # Configure logging
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# orjson encodes/parses Places payloads several times faster; stdlib json is the fallback
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+# clean_phone_number runs for every place: one C-level translate pass deletes
+# every ASCII character that isn't a digit
+_DIGIT_DELETE = str.maketrans('', '', ''.join(chr(c) for c in range(128) if not chr(c).isdigit()))
+
+# tldextract is optional; it checks hosts against its bundled Public Suffix List snapshot
+# (no network fetch). Private entries are included so joeshvac.wixsite.com is a site of
+# its own; the key itself is the host minus www. either way, so dedup doesn't change
+# with whether the package is installed
+try:
+    import tldextract
+    _tld_extract = tldextract.TLDExtract(suffix_list_urls=(), include_psl_private_domains=True)
+    TLDEXTRACT_AVAILABLE = True
+except ImportError:
+    TLDEXTRACT_AVAILABLE = False
+
+@lru_cache(maxsize=10000)
+def extract_domain(url: str) -> Optional[str]:
+    """Extract clean domain from URL (cached: the same sites come back across keywords and cities)"""
+    if not url:
+        return None
+    
+    # Add protocol if missing
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    
+    try:
+        domain = urlsplit(url).hostname
+    except ValueError as e:
+        logger.warning("Failed to extract domain from %s: %s", url, e)
+        return None
+    
+    if not domain:
+        return None
+    
+    # Reject hosts without a known public suffix (intranet names, typos)
+    if TLDEXTRACT_AVAILABLE:
+        parts = _tld_extract(domain)
+        if not (parts.domain and parts.suffix):
+            return None
+    
+    # Remove www prefix
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    
+    # Validate domain format
+    if '.' not in domain or len(domain) < 4:
+        return None
+    
+    return domain
+
+def _grid_cells(lat: float, lng: float, radius_km: float, size: int) -> List[Dict[str, Any]]:
+    """Split the square around a city centre into size x size circular locationBias cells"""
+    lat_span = radius_km / 111.0
+    lng_span = radius_km / (111.0 * math.cos(math.radians(lat)))
+    # Circumscribe each square cell; Places caps the bias radius at 50 km
+    cell_radius_m = min(radius_km / size * math.sqrt(2) * 1000, 50000.0)
+    
+    cells = []
+    for row in range(size):
+        for col in range(size):
+            cells.append({
+                "circle": {
+                    "center": {
+                        "latitude": lat - lat_span + (2 * row + 1) * lat_span / size,
+                        "longitude": lng - lng_span + (2 * col + 1) * lng_span / size
+                    },
+                    "radius": cell_radius_m
+                }
+            })
+    return cells
+
 class HVACLeadScraper:
     """Enhanced HVAC Lead Scraper with quality scoring and database integration"""
     
@@ -25,11 +114,35 @@ class HVACLeadScraper:
         self.base_url = "https://places.googleapis.com/v1/places:searchText"
         self.headers = {
             "Content-Type": "application/json",
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.nationalPhoneNumber,places.websiteUri,places.googleMapsUri,places.primaryTypeDisplayName,places.businessStatus,places.rating,places.userRatingCount,places.priceLevel"
+            # Google APIs only gzip responses when the User-Agent also mentions gzip
+            "Accept-Encoding": "gzip, deflate",
+            "User-Agent": f"hvac-lead-scraper {requests.utils.default_user_agent()} (gzip)",
+            "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.nationalPhoneNumber,places.websiteUri,places.googleMapsUri,places.primaryTypeDisplayName,places.businessStatus,places.rating,places.userRatingCount,places.priceLevel"
         }
         self.session = requests.Session()
         self.session.headers.update(self.headers)
         
+        # One keep-alive connection per concurrent worker; the default pool of 10
+        # would drop and re-handshake connections when PLACES_CONCURRENCY is higher
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(10, config.PLACES_CONCURRENCY), pool_block=True)
+        self.session.mount("https://", adapter)
+        
+        # Duplicate keys of existing leads, loaded once per scrape_leads run
+        self._seen_domains: Set[str] = set()
+        self._seen_name_phone: Set[Tuple[str, str]] = set()
+        
+        # Paces actual Places requests across all workers; cache hits are free
+        self.requests_per_second = max(config.PLACES_REQUESTS_PER_SECOND, 0.1)
+        self._limiter = TokenBucket(self.requests_per_second, capacity=max(1.0, self.requests_per_second))
+        self.max_retries = 4
+        
+        # Single writer thread: SQLite commits overlap with processing the next response,
+        # and one long-lived worker keeps reusing the same thread-local connection
+        self._db_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='lead-writer')
+        
+        # scraped_date for built leads; refreshed at the start of each scrape_leads run
+        self._today = datetime.now().date()
+        
         # Quality scoring weights
         self.quality_weights = {
             'has_website': 30,
@@ -38,32 +151,17 @@ class HVACLeadScraper:
             'many_reviews': 15,
             'complete_address': 10
         }
+        
+        # Rating and review bonuses as lookup tables: index int(rating * 10) (0-50) and
+        # the review count capped at 50, so scoring is one index per field
+        high_rating = self.quality_weights['high_rating']
+        many_reviews = self.quality_weights['many_reviews']
+        self._rating_bonus = [0] * 35 + [high_rating // 2] * 5 + [high_rating] * 11
+        self._reviews_bonus = [0] * 20 + [many_reviews // 2] * 30 + [many_reviews]
     
     def extract_domain(self, url: str) -> Optional[str]:
         """Extract clean domain from URL"""
-        if not url:
-            return None
-        
-        try:
-            # Add protocol if missing
-            if not url.startswith(('http://', 'https://')):
-                url = 'https://' + url
-            
-            parsed = urlparse(url)
-            domain = parsed.netloc.lower()
-            
-            # Remove www prefix
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            # Validate domain format
-            if '.' not in domain or len(domain) < 4:
-                return None
-                
-            return domain
-        except Exception as e:
-            logger.warning(f"Failed to extract domain from {url}: {e}")
-            return None
+        return extract_domain(url)
     
     def calculate_quality_score(self, place_data: Dict[str, Any]) -> int:
         """Calculate quality score for a lead"""
@@ -77,43 +175,56 @@ class HVACLeadScraper:
         if place_data.get('phone'):
             score += self.quality_weights['has_phone']
         
-        # High rating (4.0+)
-        rating = place_data.get('rating', 0)
-        if rating >= 4.0:
-            score += self.quality_weights['high_rating']
-        elif rating >= 3.5:
-            score += self.quality_weights['high_rating'] // 2
+        # High rating (4.0+, half for 3.5+)
+        score += self._rating_bonus[min(max(int(place_data.get('rating', 0) * 10), 0), 50)]
         
-        # Many reviews (20+)
-        review_count = place_data.get('user_rating_count', 0)
-        if review_count >= 50:
-            score += self.quality_weights['many_reviews']
-        elif review_count >= 20:
-            score += self.quality_weights['many_reviews'] // 2
+        # Many reviews (50+, half for 20+)
+        score += self._reviews_bonus[min(max(int(place_data.get('user_rating_count', 0)), 0), 50)]
         
         # Complete address
         address = place_data.get('address', '')
-        if address and len(address.split(',')) >= 3:  # City, State, ZIP
+        if address and address.count(',') >= 2:  # City, State, ZIP
             score += self.quality_weights['complete_address']
         
         return min(score, 100)  # Cap at 100
     
+    def calculate_quality_scores(self, leads: List[Dict[str, Any]]) -> List[int]:
+        """Score a batch of leads with the weights resolved once for the whole batch"""
+        weights = self.quality_weights
+        website_points = weights['has_website']
+        phone_points = weights['has_phone']
+        rating_bonus, reviews_bonus = self._rating_bonus, self._reviews_bonus
+        address_points = weights['complete_address']
+        
+        scores = []
+        for lead in leads:
+            address = lead.get('address', '')
+            
+            score = (
+                (website_points if lead.get('website') else 0)
+                + (phone_points if lead.get('phone') else 0)
+                + rating_bonus[min(max(int(lead.get('rating', 0) * 10), 0), 50)]
+                + reviews_bonus[min(max(int(lead.get('user_rating_count', 0)), 0), 50)]
+                + (address_points if address and address.count(',') >= 2 else 0)
+            )
+            scores.append(min(score, 100))
+        
+        return scores
+    
     def clean_phone_number(self, phone: str) -> Optional[str]:
         """Clean and validate phone number"""
         if not phone:
             return None
         
-        # Remove all non-digit characters except + and -
-        cleaned = re.sub(r'[^\d+\-\(\)\s]', '', phone)
-        
-        # Extract digits only for validation
-        digits_only = re.sub(r'[^\d]', '', cleaned)
+        digits = phone.translate(_DIGIT_DELETE)
+        if not digits.isascii():
+            # Rare non-ASCII punctuation or digits survive the table; keep ASCII digits only
+            digits = ''.join(char for char in digits if '0' <= char <= '9')
         
-        # Validate US phone number (10 digits)
-        if len(digits_only) == 10:
-            return cleaned
-        elif len(digits_only) == 11 and digits_only.startswith('1'):
-            return cleaned
+        # Validate US phone number (10 digits, optionally with a leading 1)
+        if len(digits) == 10 or (len(digits) == 11 and digits[0] == '1'):
+            # One canonical format so the same number always compares equal
+            return f"({digits[-10:-7]}) {digits[-7:-4]}-{digits[-4:]}"
         
         return None
     
@@ -149,23 +260,55 @@ class HVACLeadScraper:
             logger.error(f"Error checking for duplicate lead: {e}")
             return False
     
-    def make_api_request(self, query: str, location: str) -> List[Dict[str, Any]]:
+    def _cache_key(self, query: str, location: str, location_bias: Optional[Dict[str, Any]]) -> str:
+        """Identify a Places request by everything that shapes its response"""
+        request_id = json.dumps([query, location, location_bias, self.headers["X-Goog-FieldMask"]], sort_keys=True)
+        return hashlib.sha1(request_id.encode('utf-8')).hexdigest()
+    
+    def _cached_places(self, query: str, location: str, location_bias: Optional[Dict[str, Any]] = None) -> Optional[List[Dict[str, Any]]]:
+        """Return places from a recent identical request, or None when there is no fresh cache entry"""
+        max_age = config.PLACES_CACHE_HOURS * 3600
+        if max_age <= 0:
+            return None
+        
+        try:
+            blob = db.get_cached_response(self._cache_key(query, location, location_bias), max_age)
+            return _loads(zlib.decompress(blob)) if blob is not None else None
+        except Exception as e:
+            logger.warning(f"Ignoring Places cache entry for '{query}' in '{location}': {e}")
+            return None
+    
+    def make_api_request(self, query: str, location: str, location_bias: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Make API request to Google Places"""
         payload = {
             "textQuery": f"{query} in {location}",
             "maxResultCount": 20,
             "languageCode": "en"
         }
+        if location_bias:
+            payload["locationBias"] = location_bias
         
         try:
-            response = self.session.post(
-                f"{self.base_url}?key={self.api_key}",
-                json=payload,
-                timeout=15
-            )
+            for attempt in range(self.max_retries):
+                self._limiter.acquire()
+                response = self.session.post(
+                    f"{self.base_url}?key={self.api_key}",
+                    data=_dumps(payload),  # Content-Type is set on the session
+                    timeout=15
+                )
+                if response.status_code != 429:
+                    break
+                
+                # Back off exponentially and lower the shared rate for every worker
+                self._limiter.slow_down()
+                if attempt < self.max_retries - 1:
+                    delay = 2 ** attempt
+                    logger.warning("Rate limit hit for '%s' in '%s', retrying in %ds (now %.2f req/s)",
+                                   query, location, delay, self._limiter.rate)
+                    time.sleep(delay)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _loads(response.content)
                 places = data.get("places", [])
                 
                 # Log API usage
@@ -176,11 +319,20 @@ class HVACLeadScraper:
                     f'Found {len(places)} places'
                 )
                 
+                # Only successful responses are cached; errors and rate limits are retried next run
+                if config.PLACES_CACHE_HOURS > 0:
+                    try:
+                        db.cache_response(
+                            self._cache_key(query, location, location_bias),
+                            zlib.compress(_dumps(places))
+                        )
+                    except Exception as e:
+                        logger.warning(f"Failed to cache Places response for '{query}' in '{location}': {e}")
+                
                 return places
                 
             elif response.status_code == 429:
-                logger.warning(f"Rate limit hit for '{query}' in '{location}'")
-                time.sleep(60)  # Wait 1 minute
+                logger.warning(f"Rate limit hit for '{query}' in '{location}', giving up after {self.max_retries} attempts")
                 return []
                 
             else:
@@ -194,8 +346,33 @@ class HVACLeadScraper:
             logger.error(f"API request error for '{query}' in '{location}': {e}")
             return []
     
+    def _search(self, keyword: str, city: str, location_bias: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Run one Places query on a worker thread, from the response cache when possible"""
+        places = self._cached_places(keyword, city, location_bias)
+        if places is not None:
+            logger.debug("Using cached Places results for '%s' in '%s'", keyword, city)
+            return places
+        
+        return self.make_api_request(keyword, city, location_bias)
+    
     def process_place(self, place: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Process a single place from API response"""
+        lead_data = self.build_lead(place)
+        if not lead_data:
+            return None
+        
+        # Calculate quality score
+        lead_data['quality_score'] = self.calculate_quality_score(lead_data)
+        
+        # Check for duplicates
+        if self.is_duplicate_lead(lead_data['business_name'], lead_data['domain'], lead_data['phone']):
+            logger.debug("Skipping duplicate: %s", lead_data['business_name'])
+            return None
+        
+        return lead_data
+    
+    def build_lead(self, place: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Build lead data from a place, without the duplicate check or quality score"""
         try:
             # Skip permanently closed businesses
             if place.get("businessStatus") == "CLOSED_PERMANENTLY":
@@ -215,11 +392,6 @@ class HVACLeadScraper:
             if not domain:
                 return None
             
-            # Check for duplicates
-            if self.is_duplicate_lead(business_name, domain, phone):
-                logger.debug(f"Skipping duplicate: {business_name}")
-                return None
-            
             # Build lead data
             lead_data = {
                 'business_name': business_name,
@@ -232,12 +404,9 @@ class HVACLeadScraper:
                 'business_status': place.get("businessStatus", "OPERATIONAL"),
                 'rating': place.get("rating", 0),
                 'user_rating_count': place.get("userRatingCount", 0),
-                'scraped_date': datetime.now().date()
+                'scraped_date': self._today
             }
             
-            # Calculate quality score
-            lead_data['quality_score'] = self.calculate_quality_score(lead_data)
-            
             return lead_data
             
         except Exception as e:
@@ -248,59 +417,114 @@ class HVACLeadScraper:
         """Main scraping function"""
         logger.info("🔍 Starting HVAC lead scraping...")
         
-        start_time = datetime.now()
+        start_time = time.monotonic()
+        self._today = datetime.now().date()
+        # A 429 slow-down lasts for the run it happened in, not every later daemon cycle
+        self._limiter.rate = self.requests_per_second
         total_found = 0
         total_saved = 0
         total_duplicates = 0
         errors = []
         
         try:
-            total_requests = len(config.CITIES) * len(config.SEARCH_KEYWORDS)
-            current_request = 0
+            # A run is a closed world: every duplicate check after this is an in-memory lookup
+            self._seen_domains, self._seen_name_phone = db.get_lead_dedup_keys()
+            seen_domains, seen_name_phone = self._seen_domains, self._seen_name_phone
+            
+            # One query per (city, keyword), or one per grid cell for cities with known coordinates
+            grid_size = config.PLACES_GRID_SIZE
+            coordinates = config.CITY_COORDINATES
+            city_cells = {
+                city: _grid_cells(*coordinates[city], grid_size) if grid_size > 1 and city in coordinates else [None]
+                for city in config.CITIES
+            }
+            queries = [
+                (city, keyword, cell)
+                for city in config.CITIES
+                for keyword in config.SEARCH_KEYWORDS
+                for cell in city_cells[city]
+            ]
+            total_requests = len(queries)
+            
+            # Overlapping grid cells return the same place more than once
+            seen_place_ids: Set[str] = set()
+            
+            # Pending lead inserts on the writer thread: (keyword, city, future)
+            writes = []
             
-            for city in config.CITIES:
-                for keyword in config.SEARCH_KEYWORDS:
-                    current_request += 1
-                    logger.info(f"🔍 Searching: '{keyword}' in '{city}' ({current_request}/{total_requests})")
+            # Places queries are network-bound: keep PLACES_CONCURRENCY of them in
+            # flight and handle the results on this thread in query order
+            workers = max(1, min(config.PLACES_CONCURRENCY, total_requests))
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='places') as executor:
+                futures = [executor.submit(self._search, keyword, city, cell) for city, keyword, cell in queries]
+                
+                for current_request, ((city, keyword, _), future) in enumerate(zip(queries, futures), 1):
+                    logger.info("🔍 Searching: '%s' in '%s' (%d/%d)", keyword, city, current_request, total_requests)
                     
                     try:
-                        places = self.make_api_request(keyword, city)
+                        places = future.result()
                         total_found += len(places)
                         
+                        candidates = []
                         for place in places:
-                            lead_data = self.process_place(place)
+                            place_id = place.get("id")
+                            if place_id:
+                                if place_id in seen_place_ids:
+                                    continue
+                                seen_place_ids.add(place_id)
                             
+                            lead_data = self.build_lead(place)
                             if lead_data:
-                                try:
-                                    lead_id = db.insert_lead(lead_data)
-                                    if lead_id > 0:
-                                        total_saved += 1
-                                        logger.debug(f"✅ Saved: {lead_data['business_name']}")
-                                    else:
-                                        logger.warning(f"Failed to save: {lead_data['business_name']}")
-                                except Exception as e:
-                                    logger.error(f"Database error saving lead: {e}")
-                                    errors.append(f"Database error: {str(e)}")
-                            else:
+                                candidates.append(lead_data)
+                        total_duplicates += len(places) - len(candidates)
+                        
+                        # Score the whole response in one pass
+                        for lead_data, score in zip(candidates, self.calculate_quality_scores(candidates)):
+                            lead_data['quality_score'] = score
+                        
+                        pending_leads = []
+                        
+                        for lead_data in candidates:
+                            name_phone = (lead_data['business_name'], lead_data['phone'])
+                            
+                            if lead_data['domain'] in seen_domains or name_phone in seen_name_phone:
+                                logger.debug("Skipping duplicate: %s", lead_data['business_name'])
                                 total_duplicates += 1
+                            else:
+                                # Later places in this run must see this lead as existing
+                                seen_domains.add(lead_data['domain'])
+                                if lead_data['phone']:
+                                    seen_name_phone.add(name_phone)
+                                pending_leads.append(lead_data)
                         
-                        # Respectful delay between requests
-                        time.sleep(config.THROTTLE_DELAY)
+                        # Save this response's new leads in a single transaction
+                        if pending_leads:
+                            writes.append((keyword, city, self._db_executor.submit(db.insert_leads_bulk, pending_leads)))
                         
                     except Exception as e:
                         error_msg = f"Error processing {keyword} in {city}: {str(e)}"
                         logger.error(error_msg)
                         errors.append(error_msg)
             
+            for keyword, city, write in writes:
+                try:
+                    saved = write.result()
+                    total_saved += saved
+                    logger.debug("✅ Saved %d leads for '%s' in '%s'", saved, keyword, city)
+                except Exception as e:
+                    logger.error(f"Database error saving leads: {e}")
+                    errors.append(f"Database error: {str(e)}")
+            
             # Calculate duration
-            duration = datetime.now() - start_time
+            duration = timedelta(seconds=int(time.monotonic() - start_time))
             
             # Prepare summary
             summary = {
                 'total_found': total_found,
                 'total_saved': total_saved,
                 'total_duplicates': total_duplicates,
-                'duration': str(duration).split('.')[0],  # Remove microseconds
+                'duration': str(duration),
                 'errors': errors,
                 'success': total_saved > 0
             }
@@ -326,7 +550,7 @@ class HVACLeadScraper:
                 'total_found': total_found,
                 'total_saved': total_saved,
                 'total_duplicates': total_duplicates,
-                'duration': str(datetime.now() - start_time).split('.')[0],
+                'duration': str(timedelta(seconds=int(time.monotonic() - start_time))),
                 'errors': errors + [error_msg],
                 'success': False
             }
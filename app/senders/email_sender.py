@@ -3,21 +3,138 @@ Enhanced Email Sender v4 - Mailgun API Integration
 High-performance email delivery system with Mailgun REST API
 """
 import requests
+import argparse
+import signal
 import time
-import random
 import logging
 import json
+import random
+import re
+import secrets
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
-import uuid
+from itertools import islice, takewhile
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Mapping, Tuple
+from requests.adapters import HTTPAdapter
 
 from ..core.config import config
 from ..core.database import db
+from ..core.rate_limit import TokenBucket
+
+# orjson parses Mailgun responses and encodes recipient-variables faster; stdlib json is the fallback
+try:
+    import orjson
+    _loads = orjson.loads
+    _dumps = orjson.dumps
+except ImportError:
+    _loads = json.loads
+    _dumps = json.dumps
 
-# Configure logging
-logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
+# Logging is configured by the entry point (and app.core.database on import)
 logger = logging.getLogger(__name__)
 
+def configure_logging():
+    """Set up root logging for standalone runs of this module"""
+    # force: app.core.database already installed a bare handler on import
+    logging.basicConfig(
+        level=getattr(logging, config.LOG_LEVEL),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        force=True
+    )
+
+# Cheap shape check; anything failing it would only come back as a Mailgun 400
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+def _parse(response) -> Dict[str, Any]:
+    """Decode a Mailgun JSON response body; empty or non-JSON bodies (proxy error pages) give {}"""
+    if not response.content:
+        return {}
+    try:
+        return _loads(response.content)
+    except ValueError:
+        return {}
+
+# Transient Mailgun responses worth another attempt
+_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+def _backoff_delay(attempt: int, response=None) -> float:
+    """Full-jitter back-off: uniform over 0..min(30s, 2**attempt s), but no shorter than Retry-After (max 60s)"""
+    delay = random.uniform(0, min(30.0, 2.0 ** attempt))
+    if response is not None:
+        try:
+            delay = max(delay, min(60.0, float(response.headers.get('Retry-After', 0))))
+        except (TypeError, ValueError):
+            pass  # HTTP-date form or garbage
+    return delay
+
+# One keep-alive Mailgun session per API key, shared by every EmailSender in the process
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+def _get_session(api_key: str) -> requests.Session:
+    """Return the process-wide Mailgun session for api_key, creating it on first use"""
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(api_key)
+        if session is None:
+            session = requests.Session()
+            session.auth = ("api", api_key)
+            
+            # urllib3 pools connections per (scheme, host, port); every request goes to one
+            # Mailgun host, so one pool with a keep-alive TLS connection per send worker
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(32, config.MAILGUN_CONCURRENCY), pool_block=True)
+            session.mount("https://", adapter)
+            _SESSIONS[api_key] = session
+        return session
+
+class _LeadFields(dict):
+    """Template fields for str.format_map; placeholders a lead has no value for render empty"""
+    
+    def __missing__(self, key: str) -> str:
+        return ''
+
+def _completed(result: Any) -> Future:
+    """Wrap an already-known result in a finished Future"""
+    future = Future()
+    future.set_result(result)
+    return future
+
+# Stands in for {business_name} while a template is partially evaluated
+_BUSINESS_SENTINEL = '\x00business_name\x00'
+
+def _specialize_template(body: str, **fixed: str) -> Optional[Tuple[List[str], List[str]]]:
+    """Render a str.format body with the fixed fields filled in, split around {business_name}
+
+    Returns the (text, html) pieces to join a business name into, or None when the
+    body needs other per-lead fields and has to be formatted per lead.
+    """
+    try:
+        rendered = body.format(business_name=_BUSINESS_SENTINEL, **fixed)
+    except (KeyError, IndexError):
+        return None
+    
+    return (rendered.split(_BUSINESS_SENTINEL),
+            rendered.replace('\n', '<br>\n').split(_BUSINESS_SENTINEL))
+
+def _bounded_as_completed(executor: ThreadPoolExecutor, fn: Callable[[Any], Any], items: Iterable[Any], limit: int) -> Iterator[Tuple[Any, Future]]:
+    """Run fn over items with at most `limit` calls submitted at once, yielding (item, future) as each finishes"""
+    items = iter(items)
+    pending = {executor.submit(fn, item): item for item in islice(items, limit)}
+    
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            # Refill before handing the result back so the pool never idles
+            for item in islice(items, 1):
+                pending[executor.submit(fn, item)] = item
+            yield pending.pop(future), future
+
+# The default body lives in templates/email_body.txt; get_default_template builds the
+# shared read-only view on first use and only rebuilds it after config.reload()
+_DEFAULT_SUBJECT = 'Boost Your HVAC Business with Professional Marketing Solutions'
+_default_template: Optional[Mapping[str, str]] = None
+
 class EmailSender:
     """Enhanced email sender using Mailgun REST API"""
     
@@ -27,125 +144,174 @@ class EmailSender:
         self.domain = config.MAILGUN_DOMAIN
         self.from_email = config.MAILGUN_FROM_EMAIL
         
+        # Without a key every send is a 401 that still lands in email_sends and
+        # starts the lead's cooldown, so refuse to start instead
+        if not (self.api_key and self.domain):
+            raise RuntimeError("Mailgun credentials not configured (MAILGUN_API_KEY / MAILGUN_DOMAIN)")
+        
         # Determine API base URL based on region
         if config.MAILGUN_REGION.upper() == 'EU':
-            self.base_url = f"https://api.eu.mailgun.net/v3/{self.domain}"
+            api_root = "https://api.eu.mailgun.net/v3"
         else:
-            self.base_url = f"https://api.mailgun.net/v3/{self.domain}"
+            api_root = "https://api.mailgun.net/v3"
+        self.base_url = f"{api_root}/{self.domain}"
+        self._messages_url = f"{self.base_url}/messages"
+        self._domain_url = f"{api_root}/domains/{self.domain}"
         
         # Email templates
         self.default_template = self.get_default_template()
+        self._subject_default = self.default_template['subject']
+        
+        # The affiliate link is fixed for the process, so each template body is rendered
+        # once (the default up front) and only the business name is joined in per lead
+        self._affiliate_link_str = config.FIVERR_AFFILIATE_LINK
+        self._template_parts: Dict[str, Optional[Tuple[List[str], List[str]]]] = {}
+        self._specialized(self.default_template['body'])
+        
+        # Fields identical on every message (sender and tracking options), built once
+        self._email_scaffold = {'from': self.from_email}
+        if config.MAILGUN_ENABLE_TRACKING:
+            self._email_scaffold['o:tracking'] = 'yes'
+        if config.MAILGUN_TRACK_CLICKS:
+            self._email_scaffold['o:tracking-clicks'] = 'yes'
+        if config.MAILGUN_TRACK_OPENS:
+            self._email_scaffold['o:tracking-opens'] = 'yes'
         
-        # Optimized settings for Mailgun
-        self.min_delay = config.EMAIL_DELAY_MIN  # 5 seconds
-        self.max_delay = config.EMAIL_DELAY_MAX  # 15 seconds
+        # The HTML part is the text body with <br>s and only earns its keep carrying
+        # Mailgun's open pixel (click tracking rewrites text links too); otherwise a single
+        # text part halves the payload and skips the multipart wrapper
+        self._send_html = bool(config.MAILGUN_SEND_HTML and config.MAILGUN_TRACK_OPENS)
+        if config.MAILGUN_TRACK_OPENS and not config.MAILGUN_SEND_HTML:
+            logger.warning("⚠️ MAILGUN_SEND_HTML is off: opens cannot be tracked on text-only emails")
+        
+        # Optimized settings for Mailgun: sends are spaced evenly at MAX_EMAILS_PER_MINUTE
+        # across all workers instead of each worker sleeping between emails
+        self.send_rate = max(1, config.MAX_EMAILS_PER_MINUTE) / 60.0
+        self._limiter = TokenBucket(self.send_rate, capacity=1.0)
         self.cooldown_days = config.COOLDOWN_DAYS  # 1 day
         
+        # email_sends records waiting for _flush_sends; appended to from send workers and
+        # flushed every _flush_threshold sends so a crash loses little history
+        self._pending_sends: List[Dict[str, Any]] = []
+        self._flush_threshold = 50
+        self._sends_lock = threading.Lock()
+        
+        # Mid-batch email_sends flushes and batch telemetry are written behind the send loop
+        self._db_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='send-writer')
+        self._db_writes: List[Future] = []
+        
+        # Set by stop() to end run_forever after the current batch
+        self._stop = threading.Event()
+        
         # API timeout and retry settings
         self.api_timeout = config.MAILGUN_API_TIMEOUT
         self.max_retries = 3
         
-        # Session for connection pooling
-        self.session = requests.Session()
-        self.session.auth = ("api", self.api_key)
+        # Mailgun accepts at most 1000 recipients per batch call
+        self.batch_size = min(1000, max(1, config.MAILGUN_BATCH_SIZE))
+        
+        # Shared session: senders built by the runner, scripts and notifications reuse
+        # the same warm connections, which live for the whole process
+        self.session = _get_session(self.api_key)
         
-        logger.info(f"📧 Mailgun Email Sender initialized - Domain: {self.domain}")
+        logger.info("📧 Mailgun Email Sender initialized - Domain: %s", self.domain)
     
-    def get_default_template(self) -> Dict[str, str]:
-        """Get default email template"""
-        return {
-            'subject': 'Boost Your HVAC Business with Professional Marketing Solutions',
-            'body': '''Hello {business_name},
-
-I hope this message finds you well. I'm reaching out because I noticed your HVAC business and wanted to share an opportunity that could significantly boost your customer acquisition.
-
-As a fellow business professional, I understand the challenges of finding quality leads in the competitive HVAC market. That's why I want to introduce you to a proven solution that's helping HVAC contractors nationwide:
-
-🔥 **Professional HVAC Marketing Solutions**
-- Custom landing pages designed specifically for HVAC contractors
-- Lead generation systems that convert visitors into paying customers
-- Professional sales funnels that work 24/7
-- Proven strategies that increase customer engagement
-
-Why am I sharing this with you? Because I believe in supporting local HVAC businesses, and I've seen these tools help contractors just like you increase their customer base by 40-60%.
-
-**Special Offer:** You can explore these professional marketing solutions at a significant discount through this exclusive link:
-{affiliate_link}
-
-This isn't just another marketing tool - it's a complete system designed by experts who understand the HVAC industry inside and out.
-
-Benefits you'll see:
-✅ More qualified leads calling your business
-✅ Professional online presence that builds trust
-✅ Automated follow-up systems that convert prospects
-✅ Mobile-optimized designs that capture leads 24/7
-
-I'm not asking for anything in return - just paying it forward to help fellow business owners succeed. Take a look when you have a moment, and if it seems like a good fit, you can get started right away.
-
-Best regards,
-Marketing Partner
-
-P.S. This special pricing is only available for a limited time, so I'd recommend checking it out soon if you're interested in growing your customer base.
-
----
-This message was sent to help grow your business. If you'd prefer not to receive similar opportunities, simply reply with "REMOVE" and I'll respect your preference immediately.'''
-        }
+    def get_default_template(self) -> Mapping[str, str]:
+        """Get default email template (read-only; copy it to customize)"""
+        global _default_template
+        # config caches the body, so a different object means the template was reloaded
+        body = config.get_email_template()
+        if _default_template is None or _default_template['body'] is not body:
+            _default_template = MappingProxyType({'subject': _DEFAULT_SUBJECT, 'body': body})
+        return _default_template
     
     def create_email_data(self, lead: Dict[str, Any], template: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Create email data for Mailgun API"""
         template = template or self.default_template
+        get = lead.get
+        business_name = get('business_name', 'Business Owner')
         
         # Personalize email body
-        body = template['body'].format(
-            business_name=lead.get('business_name', 'Business Owner'),
-            address=lead.get('address', ''),
-            phone=lead.get('phone', ''),
-            website=lead.get('website', ''),
-            affiliate_link=config.FIVERR_AFFILIATE_LINK
-        )
-        
-        # Create email data for Mailgun API
+        parts = self._specialized(template['body'])
+        if parts:
+            text_parts, html_parts = parts
+            body = business_name.join(text_parts)
+            html = business_name.join(html_parts) if self._send_html else None
+        else:
+            body = template['body'].format_map(_LeadFields(
+                business_name=business_name,
+                address=get('address', ''),
+                phone=get('phone', ''),
+                website=get('website', ''),
+                affiliate_link=self._affiliate_link_str
+            ))
+            html = body.replace('\n', '<br>\n') if self._send_html else None
+        
+        # Create email data for Mailgun API: the shared scaffold plus per-lead fields
         email_data = {
-            'from': self.from_email,
+            **self._email_scaffold,
             'to': lead['email_address'],
             'subject': template['subject'],
-            'html': body.replace('\n', '<br>\n'),  # Convert to HTML
-            'text': body  # Plain text version
+            'text': body,  # Plain text version
+            # Custom variables for tracking
+            'v:lead_id': str(lead['id']),
+            'v:business_name': get('business_name', '')
         }
-        
-        # Add tracking if enabled
-        if config.MAILGUN_ENABLE_TRACKING:
-            email_data['o:tracking'] = 'yes'
-        
-        if config.MAILGUN_TRACK_CLICKS:
-            email_data['o:tracking-clicks'] = 'yes'
-            
-        if config.MAILGUN_TRACK_OPENS:
-            email_data['o:tracking-opens'] = 'yes'
-        
-        # Add custom variables for tracking
-        email_data['v:lead_id'] = str(lead['id'])
-        email_data['v:business_name'] = lead.get('business_name', '')
-        
+        if html is not None:
+            email_data['html'] = html  # HTML version
         return email_data
     
+    def warm_up(self, connections: int = 1) -> None:
+        """Open up to `connections` pooled keep-alive connections to Mailgun before the first send"""
+        def touch(_):
+            # A cheap authenticated GET pays DNS, TCP, TLS and the key check up front
+            try:
+                response = self.session.get(self._domain_url, timeout=self.api_timeout)
+                if response.status_code == 401:
+                    logger.warning("⚠️ Mailgun rejected the API key during warmup")
+            except requests.exceptions.RequestException as e:
+                logger.debug("Mailgun warmup request failed: %s", e)
+        
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix='mailgun-warmup') as executor:
+            list(executor.map(touch, range(connections)))
+    
+    def _specialized(self, body: str) -> Optional[Tuple[List[str], List[str]]]:
+        """Pre-rendered pieces for a template body, specialized once per distinct body"""
+        try:
+            return self._template_parts[body]
+        except KeyError:
+            parts = self._template_parts[body] = _specialize_template(body, affiliate_link=self._affiliate_link_str)
+            return parts
+    
     def send_via_mailgun_api(self, email_data: Dict[str, Any]) -> Dict[str, Any]:
         """Send email via Mailgun REST API with retry logic"""
-        url = f"{self.base_url}/messages"
+        url = self._messages_url
+        post = self.session.post
         
         for attempt in range(self.max_retries):
+            last_attempt = attempt == self.max_retries - 1
             try:
-                response = self.session.post(
+                response = post(
                     url,
                     data=email_data,
                     timeout=self.api_timeout
                 )
                 
+                if response.status_code in _RETRY_STATUSES and not last_attempt:
+                    if response.status_code == 429:
+                        # Mailgun is throttling the account: pace the rest of the batch slower too
+                        self._limiter.slow_down(min_rate=self.send_rate / 4)
+                    delay = _backoff_delay(attempt, response)
+                    logger.warning("⚠️ Mailgun API %d, retrying in %.1fs (attempt %d/%d)",
+                                   response.status_code, delay, attempt + 1, self.max_retries)
+                    time.sleep(delay)
+                    continue
+                
                 # Parse response
-                response_data = response.json() if response.content else {}
+                response_data = _parse(response)
                 
                 if response.status_code == 200:
-                    logger.debug(f"✅ Mailgun API success: {response_data}")
+                    logger.debug("✅ Mailgun API success: %s", response_data)
                     return {
                         'success': True,
                         'message_id': response_data.get('id', ''),
@@ -162,8 +328,8 @@ This message was sent to help grow your business. If you'd prefer not to receive
                     
             except requests.exceptions.Timeout:
                 logger.warning(f"⏱️ Mailgun API timeout (attempt {attempt + 1}/{self.max_retries})")
-                if attempt < self.max_retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                if not last_attempt:
+                    time.sleep(_backoff_delay(attempt))
                     continue
                 return {
                     'success': False,
@@ -171,6 +337,17 @@ This message was sent to help grow your business. If you'd prefer not to receive
                     'status_code': 0
                 }
                 
+            except requests.exceptions.ConnectionError as e:
+                logger.warning(f"⚠️ Mailgun API connection error (attempt {attempt + 1}/{self.max_retries}): {e}")
+                if not last_attempt:
+                    time.sleep(_backoff_delay(attempt))
+                    continue
+                return {
+                    'success': False,
+                    'error': f'Connection error after {self.max_retries} attempts: {str(e)}',
+                    'status_code': 0
+                }
+                
             except requests.exceptions.RequestException as e:
                 logger.error(f"❌ Mailgun API request error: {e}")
                 return {
@@ -185,25 +362,64 @@ This message was sent to help grow your business. If you'd prefer not to receive
             'status_code': 0
         }
     
-    def send_single_email(self, lead: Dict[str, Any], template: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
-        """Send email to a single lead via Mailgun API"""
-        campaign_id = str(uuid.uuid4())[:8]
+    def _queue_send(self, send_data: Dict[str, Any]):
+        """Buffer an email_sends record for the next _flush_sends"""
+        with self._sends_lock:
+            self._pending_sends.append(send_data)
+    
+    def _flush_sends(self, background: bool = False):
+        """Write buffered email_sends records in one transaction (on the writer thread if background)"""
+        with self._sends_lock:
+            sends, self._pending_sends = self._pending_sends, []
+        
+        if not sends:
+            return
+        
+        if background:
+            self._write_behind(self._insert_sends, sends)
+        else:
+            self._insert_sends(sends)
+    
+    def _insert_sends(self, sends: List[Dict[str, Any]]):
+        """Bulk insert email_sends records, logging instead of raising on failure"""
+        try:
+            db.insert_email_send_bulk(sends)
+        except Exception as e:
+            logger.error(f"Failed to record {len(sends)} email sends: {e}")
+    
+    def _write_behind(self, fn: Callable[..., Any], *args: Any):
+        """Queue a database write on the writer thread instead of blocking the caller"""
+        self._db_writes.append(self._db_writer.submit(fn, *args))
+    
+    def _drain_writes(self):
+        """Wait for queued database writes, logging any that failed"""
+        writes, self._db_writes = self._db_writes, []
+        for write in writes:
+            try:
+                write.result()
+            except Exception as e:
+                logger.error(f"Background database write failed: {e}")
+    
+    def send_single_email(self, lead: Dict[str, Any], template: Optional[Dict[str, str]] = None, *,
+                          now: Optional[datetime] = None, campaign_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send email to a single lead via Mailgun API (cooldown is enforced by db.get_leads_for_sending)"""
+        try:
+            return self._send_one(lead, template, now=now, campaign_id=campaign_id)
+        finally:
+            self._flush_sends()
+    
+    def _send_one(self, lead: Dict[str, Any], template: Optional[Dict[str, str]] = None, *,
+                  now: Optional[datetime] = None, campaign_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send one email, buffering its email_sends record instead of writing it"""
+        campaign_id = campaign_id or secrets.token_hex(4)
+        now = now or datetime.now()  # one clock read stamps whichever record this send produces
         
         try:
-            # Check if email was sent recently (anti-spam)
-            if db.check_email_sent_recently(lead['id'], self.cooldown_days):
-                logger.debug(f"Skipping {lead['business_name']}: email sent within {self.cooldown_days} days")
-                return {
-                    'status': 'skipped',
-                    'error': f'Email sent within {self.cooldown_days} days',
-                    'lead_id': lead['id'],
-                    'campaign_id': campaign_id
-                }
-            
             # Create email data
             email_data = self.create_email_data(lead, template)
             
-            # Send via Mailgun API
+            # Send via Mailgun API once the shared send pace allows it
+            self._limiter.acquire()
             api_result = self.send_via_mailgun_api(email_data)
             
             if api_result['success']:
@@ -212,16 +428,16 @@ This message was sent to help grow your business. If you'd prefer not to receive
                     'lead_id': lead['id'],
                     'email_address': lead['email_address'],
                     'subject': email_data['subject'],
-                    'sent_date': datetime.now(),
+                    'sent_date': now,
                     'status': 'sent',
                     'response_code': str(api_result['status_code']),
                     'campaign_id': campaign_id,
                     'message_id': api_result.get('message_id', '')
                 }
                 
-                db.insert_email_send(send_data)
+                self._queue_send(send_data)
                 
-                logger.info(f"✅ Email sent to {lead['business_name']} ({lead['email_address']}) - ID: {api_result.get('message_id', 'N/A')}")
+                logger.info("✅ Email sent to %s (%s) - ID: %s", lead['business_name'], lead['email_address'], api_result.get('message_id', 'N/A'))
                 
                 return {
                     'status': 'sent',
@@ -233,75 +449,49 @@ This message was sent to help grow your business. If you'd prefer not to receive
             else:
                 # Log failed send
                 error_msg = api_result.get('error', 'Unknown API error')
-                
-                send_data = {
-                    'lead_id': lead['id'],
-                    'email_address': lead['email_address'],
-                    'subject': email_data['subject'],
-                    'sent_date': datetime.now(),
-                    'status': 'failed',
-                    'error_message': error_msg,
-                    'response_code': str(api_result.get('status_code', 0)),
-                    'campaign_id': campaign_id
-                }
-                
-                db.insert_email_send(send_data)
-                
                 logger.error(f"❌ Failed to send to {lead['business_name']}: {error_msg}")
                 
-                return {
-                    'status': 'failed',
-                    'error': error_msg,
-                    'lead_id': lead['id'],
-                    'campaign_id': campaign_id
-                }
+                return self._record_failure(lead, email_data['subject'], error_msg, campaign_id, now,
+                                            response_code=str(api_result.get('status_code', 0)))
                 
+        except (KeyError, TypeError, ValueError):
+            # A malformed lead or template fails every lead the same way: surface it
+            # instead of recording a failure (and starting a cooldown) for each one
+            raise
         except Exception as e:
             error_msg = f"Unexpected error: {str(e)}"
             logger.error(f"❌ {lead['business_name']}: {error_msg}")
             
-            send_data = {
-                'lead_id': lead['id'],
-                'email_address': lead['email_address'],
-                'subject': template['subject'] if template else self.default_template['subject'],
-                'sent_date': datetime.now(),
-                'status': 'failed',
-                'error_message': error_msg,
-                'campaign_id': campaign_id
-            }
-            
-            db.insert_email_send(send_data)
-            
-            return {
-                'status': 'failed',
-                'error': error_msg,
-                'lead_id': lead['id'],
-                'campaign_id': campaign_id
-            }
+            subject = template['subject'] if template else self._subject_default
+            return self._record_failure(lead, subject, error_msg, campaign_id, now)
     
-    def intelligent_delay(self, email_count: int):
-        """Apply intelligent delay between emails (much shorter for Mailgun)"""
-        base_delay = random.uniform(self.min_delay, self.max_delay)
-        
-        # Slight increase for higher volumes (less aggressive than Gmail)
-        if email_count > 50:
-            base_delay *= 1.2
-        elif email_count > 100:
-            base_delay *= 1.5
-        
-        # Add random variation (±10%)
-        variation = base_delay * 0.1
-        delay = base_delay + random.uniform(-variation, variation)
-        
-        logger.debug(f"Waiting {delay:.1f} seconds before next email...")
-        time.sleep(delay)
+    def _record_failure(self, lead: Dict[str, Any], subject: str, error_msg: str, campaign_id: str,
+                        now: datetime, response_code: Optional[str] = None) -> Dict[str, Any]:
+        """Buffer the email_sends record for a failed send and build its result"""
+        self._queue_send({
+            'lead_id': lead['id'],
+            'email_address': lead['email_address'],
+            'subject': subject,
+            'sent_date': now,
+            'status': 'failed',
+            'error_message': error_msg,
+            'response_code': response_code,
+            'campaign_id': campaign_id
+        })
+        
+        return {
+            'status': 'failed',
+            'error': error_msg,
+            'lead_id': lead['id'],
+            'campaign_id': campaign_id
+        }
     
     def send_batch_emails(self, limit: Optional[int] = None, template: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Send emails to multiple leads with optimized Mailgun performance"""
         limit = limit or config.MAX_EMAILS_PER_RUN
-        logger.info(f"📧 Starting Mailgun email batch (limit: {limit})...")
+        logger.info("📧 Starting Mailgun email batch (limit: %d)...", limit)
         
-        start_time = datetime.now()
+        start_time = time.monotonic()
         total_processed = 0
         total_sent = 0
         total_skipped = 0
@@ -309,9 +499,17 @@ This message was sent to help grow your business. If you'd prefer not to receive
         errors = []
         
         try:
-            # Get leads ready for sending
-            leads = db.get_leads_for_sending(limit)
-            logger.info(f"Found {len(leads)} leads ready for email sending")
+            # Telemetry left behind by the previous batch lands before this one starts
+            self._drain_writes()
+            
+            # Connect to Mailgun while the lead query runs so the first sends skip the handshake
+            warmup = threading.Thread(target=self.warm_up, args=(max(1, config.MAILGUN_CONCURRENCY),),
+                                      name='mailgun-warmup', daemon=True)
+            warmup.start()
+            
+            # Get leads ready for sending; leads still in cooldown are filtered out in SQL
+            leads = db.get_leads_for_sending(limit, self.cooldown_days)
+            logger.info("Found %d leads ready for email sending", len(leads))
             
             if not leads:
                 return {
@@ -325,17 +523,69 @@ This message was sent to help grow your business. If you'd prefer not to receive
                     'success': False
                 }
             
-            for i, lead in enumerate(leads):
-                try:
+            # Malformed addresses fail locally: no API call and no send-rate token
+            # One campaign ID groups every email_sends record this batch produces
+            campaign_id = secrets.token_hex(4)
+            
+            valid_leads = []
+            now = datetime.now()
+            subject = template['subject'] if template else self._subject_default
+            is_valid = _EMAIL_RE.match
+            record_failure = self._record_failure
+            for lead in leads:
+                if is_valid(lead.get('email_address') or ''):
+                    valid_leads.append(lead)
+                else:
+                    total_processed += 1
+                    total_failed += 1
+                    errors.append(f"{lead['business_name']}: invalid_address")
+                    record_failure(lead, subject, 'invalid_address', campaign_id, now)
+            
+            if total_failed:
+                logger.warning("Skipping %d leads with malformed email addresses", total_failed)
+                self._flush_sends()
+            
+            # Mailgun calls are I/O bound: keep MAILGUN_CONCURRENCY sends in flight, paced
+            # together by the shared limiter, and tally each result as soon as it lands
+            workers = max(1, min(config.MAILGUN_CONCURRENCY, len(valid_leads)))
+            warmup.join(self.api_timeout)
+            self._limiter.rate = self.send_rate
+            send_one = self._send_one
+            n = len(leads)
+            debug = logger.isEnabledFor(logging.DEBUG)
+            
+            def send(lead: Dict[str, Any]) -> Dict[str, Any]:
+                return send_one(lead, template, campaign_id=campaign_id)
+            
+            # After stop() no further leads are handed out; sends already in flight finish
+            # and are recorded below, so a SIGTERM waits at most for MAILGUN_CONCURRENCY sends
+            pending_leads = takewhile(lambda lead: not self._stop.is_set(), valid_leads)
+            
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mailgun') as executor:
+                if self.batch_size > 1:
+                    # Batch results are already known; wrap them so one loop tallies both modes
+                    outcomes = ((lead, _completed(result)) for lead, result
+                                in self.send_batch_via_recipient_variables(pending_leads, template, campaign_id))
+                else:
+                    outcomes = _bounded_as_completed(executor, send, pending_leads, workers)
+                
+                # _send_one turns delivery failures into results; anything raised here is a bug
+                # (malformed lead or template) and ends the batch through the handler below
+                for lead, future in outcomes:
                     total_processed += 1
                     
-                    logger.debug(f"Processing lead {total_processed}/{len(leads)}: {lead['business_name']}")
+                    if debug:
+                        logger.debug("Processing lead %d/%d: %s", total_processed, n, lead['business_name'])
                     
                     # Send email
-                    result = self.send_single_email(lead, template)
+                    result = future.result()
                     
                     if result['status'] == 'sent':
                         total_sent += 1
+                        # Higher volumes go out 20% slower for the rest of the batch
+                        if total_sent == 51:
+                            # min(): never undo a slow-down Mailgun asked for with a 429
+                            self._limiter.rate = min(self._limiter.rate, self.send_rate / 1.2)
                     elif result['status'] == 'skipped':
                         total_skipped += 1
                     else:
@@ -343,18 +593,19 @@ This message was sent to help grow your business. If you'd prefer not to receive
                         if result.get('error'):
                             errors.append(f"{lead['business_name']}: {result['error']}")
                     
-                    # Apply intelligent delay (except for last email)
-                    if i < len(leads) - 1:
-                        self.intelligent_delay(total_sent)
-                    
-                except Exception as e:
-                    total_failed += 1
-                    error_msg = f"Error processing {lead.get('business_name', 'unknown')}: {str(e)}"
-                    logger.error(error_msg)
-                    errors.append(error_msg)
+                    if len(self._pending_sends) >= self._flush_threshold:
+                        self._flush_sends(background=True)
+            
+            if self._stop.is_set() and total_processed < len(leads):
+                logger.info("🛑 Stop requested: %d leads left for the next run", len(leads) - total_processed)
+            
+            # email_sends must be complete on return: callers report from it and the next
+            # batch's cooldown query depends on it
+            self._drain_writes()
+            self._flush_sends()
             
             # Calculate duration and success rate
-            duration = datetime.now() - start_time
+            duration = timedelta(seconds=int(time.monotonic() - start_time))
             success_rate = round((total_sent / total_processed * 100) if total_processed > 0 else 0, 1)
             
             # Prepare summary
@@ -364,26 +615,31 @@ This message was sent to help grow your business. If you'd prefer not to receive
                 'total_skipped': total_skipped,
                 'total_failed': total_failed,
                 'success_rate': success_rate,
-                'duration': str(duration).split('.')[0],
+                'duration': str(duration),
                 'errors': errors,
                 'success': total_sent > 0
             }
             
-            # Log completion
-            db.log_system_event(
+            # Log completion without waiting on the database
+            self._write_behind(
+                db.log_system_event,
                 'INFO',
                 'mailgun_sender',
                 f'Mailgun email batch completed: {total_sent}/{total_processed} emails sent',
                 f'Sent: {total_sent}, Skipped: {total_skipped}, Failed: {total_failed}, Success rate: {success_rate}%'
             )
             
-            logger.info(f"✅ Mailgun batch complete: {total_sent}/{total_processed} emails sent in {duration}")
+            logger.info("✅ Mailgun batch complete: %d/%d emails sent in %s", total_sent, total_processed, duration)
             return summary
             
         except Exception as e:
             error_msg = f"Mailgun batch sending failed: {str(e)}"
             logger.error(error_msg)
             
+            # Keep the history of whatever was sent before the failure
+            self._drain_writes()
+            self._flush_sends()
+            
             db.log_system_event('ERROR', 'mailgun_sender', error_msg, None)
             
             return {
@@ -392,11 +648,96 @@ This message was sent to help grow your business. If you'd prefer not to receive
                 'total_skipped': total_skipped,
                 'total_failed': total_failed,
                 'success_rate': 0,
-                'duration': str(datetime.now() - start_time).split('.')[0],
+                'duration': str(timedelta(seconds=int(time.monotonic() - start_time))),
                 'errors': errors + [error_msg],
                 'success': False
             }
     
+    def send_batch_via_recipient_variables(self, leads: List[Dict[str, Any]], template: Optional[Dict[str, str]] = None,
+                                           campaign_id: Optional[str] = None) -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Send to leads with one Mailgun call per batch_size chunk, yielding (lead, result) per lead
+        
+        Mailgun personalizes each copy from recipient-variables, so the body is rendered once
+        with %recipient.*% placeholders and every lead in a chunk shares the call's message ID.
+        """
+        template = template or self.default_template
+        campaign_id = campaign_id or secrets.token_hex(4)
+        subject = template['subject']
+        body = template['body'].format_map(_LeadFields(
+            business_name='%recipient.business_name%',
+            address='%recipient.address%',
+            phone='%recipient.phone%',
+            website='%recipient.website%',
+            affiliate_link=self._affiliate_link_str
+        ))
+        
+        # Everything except the recipients is identical across chunks
+        message = [
+            *self._email_scaffold.items(),
+            ('subject', subject),
+            ('text', body),
+            ('v:lead_id', '%recipient.id%'),
+            ('v:business_name', '%recipient.business_name%')
+        ]
+        if self._send_html:
+            message.append(('html', body.replace('\n', '<br>\n')))
+        
+        leads = iter(leads)
+        while True:
+            chunk = list(islice(leads, self.batch_size))
+            if not chunk:
+                return
+            
+            recipient_variables = {}
+            for lead in chunk:
+                get = lead.get
+                recipient_variables[lead['email_address']] = {
+                    'id': lead['id'],
+                    'business_name': get('business_name', 'Business Owner'),
+                    'address': get('address') or '',
+                    'phone': get('phone') or '',
+                    'website': get('website') or ''
+                }
+            
+            now = datetime.now()
+            data = message + [('to', lead['email_address']) for lead in chunk]
+            data.append(('recipient-variables', _dumps(recipient_variables)))
+            
+            try:
+                self._limiter.acquire()
+                api_result = self.send_via_mailgun_api(data)
+            except Exception as e:
+                api_result = {'success': False, 'error': f"Unexpected error: {str(e)}", 'status_code': 0}
+            
+            if api_result['success']:
+                message_id = api_result.get('message_id', '')
+                logger.info("✅ Batch of %d emails queued - ID: %s", len(chunk), message_id or 'N/A')
+                for lead in chunk:
+                    self._queue_send({
+                        'lead_id': lead['id'],
+                        'email_address': lead['email_address'],
+                        'subject': subject,
+                        'sent_date': now,
+                        'status': 'sent',
+                        'response_code': str(api_result['status_code']),
+                        'campaign_id': campaign_id,
+                        'message_id': message_id
+                    })
+                    yield lead, {
+                        'status': 'sent',
+                        'lead_id': lead['id'],
+                        'campaign_id': campaign_id,
+                        'email_address': lead['email_address'],
+                        'message_id': message_id
+                    }
+            else:
+                error_msg = api_result.get('error', 'Unknown API error')
+                logger.error(f"❌ Failed to send batch of {len(chunk)} emails: {error_msg}")
+                response_code = str(api_result.get('status_code', 0))
+                for lead in chunk:
+                    yield lead, self._record_failure(lead, subject, error_msg, campaign_id, now,
+                                                     response_code=response_code)
+    
     def send_notification_email(self, subject: str, message: str, recipient: Optional[str] = None):
         """Send notification email via Mailgun"""
         recipient = recipient or config.NOTIFICATION_EMAIL
@@ -406,6 +747,7 @@ This message was sent to help grow your business. If you'd prefer not to receive
                 logger.error("No notification recipient configured")
                 return False
             
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
             notification_data = {
                 'from': self.from_email,
                 'to': recipient,
@@ -414,7 +756,7 @@ This message was sent to help grow your business. If you'd prefer not to receive
                 <h2>HVAC Email Automation System Notification</h2>
                 <p>{message}</p>
                 <hr>
-                <p><strong>Timestamp:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+                <p><strong>Timestamp:</strong> {timestamp}</p>
                 <p><strong>Server:</strong> Production Environment</p>
                 <p><strong>Email Service:</strong> Mailgun API</p>
                 <hr>
@@ -424,7 +766,7 @@ This message was sent to help grow your business. If you'd prefer not to receive
 
 {message}
 
-Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Timestamp: {timestamp}
 Server: Production Environment
 Email Service: Mailgun API
 
@@ -436,7 +778,7 @@ This is an automated notification from your HVAC Email Automation system.
             api_result = self.send_via_mailgun_api(notification_data)
             
             if api_result['success']:
-                logger.info(f"📬 Notification sent via Mailgun: {subject}")
+                logger.info("📬 Notification sent via Mailgun: %s", subject)
                 return True
             else:
                 logger.error(f"❌ Failed to send notification: {api_result.get('error', 'Unknown error')}")
@@ -464,15 +806,57 @@ This is an automated notification from your HVAC Email Automation system.
             logger.error(f"Error getting email stats: {e}")
             return {}
     
-    def __del__(self):
-        """Cleanup session on destruction"""
-        if hasattr(self, 'session'):
-            self.session.close()
+    def run_forever(self, interval: int = 300) -> int:
+        """Send a batch every `interval` seconds until stop(), keeping the session warm; returns total sent"""
+        total_sent = 0
+        interval = max(1, interval)
+        self._stop.clear()
+        logger.info("📧 Mailgun sender running every %d seconds", interval)
+        
+        while not self._stop.is_set():
+            total_sent += self.send_batch_emails()['total_sent']
+            
+            # db buffers system events until the next write; land this batch's now so the
+            # dashboard sees it during the idle interval rather than after the next batch
+            self._drain_writes()
+            try:
+                db.flush_logs()
+            except Exception as e:
+                logger.error(f"Failed to flush system logs: {e}")
+            
+            self._stop.wait(interval)
+        
+        self._drain_writes()
+        logger.info("📧 Mailgun sender stopped after %d emails", total_sent)
+        return total_sent
+    
+    def stop(self):
+        """Ask run_forever to exit once the current batch finishes"""
+        self._stop.set()
 
-def main():
-    """Main function for standalone execution"""
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main function for standalone execution; returns the process exit status"""
+    parser = argparse.ArgumentParser(description='HVAC Email Automation - Mailgun sender')
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running and send a batch every --interval seconds (default: one batch, for cron)')
+    parser.add_argument('--interval', type=int, default=300, help='seconds between batches in --daemon mode')
+    args = parser.parse_args(argv)
+    configure_logging()
+    
     try:
         sender = EmailSender()
+        
+        if args.daemon:
+            # One process keeps its Mailgun connections and caches across batches; SIGTERM
+            # and Ctrl-C stop it between sends so every buffered record is flushed first
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(signum, lambda signum, frame: sender.stop())
+            try:
+                sender.run_forever(args.interval)
+            finally:
+                db.close_all()
+            return 0  # a clean stop succeeds even if the last batches found no leads
+        
         results = sender.send_batch_emails()
         
         print(f"\n📧 Mailgun Email Sending Results:")
@@ -488,12 +872,11 @@ def main():
             for error in results['errors'][:3]:  # Show first 3 errors
                 print(f"     - {error}")
         
-        return results['total_sent']
+        return 0 if results['total_sent'] > 0 else 1
         
     except Exception as e:
         logger.error(f"Main execution failed: {e}")
-        return 0
+        return 1
 
 if __name__ == "__main__":
-    sent_count = main()
-    exit(0 if sent_count > 0 else 1)
+    exit(main())
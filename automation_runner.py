@@ -15,9 +15,6 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.core.config import config
 from app.core.database import db
-from app.scrapers.hvac_scraper import HVACLeadScraper
-from app.enrichers.email_enricher import EmailEnricher
-from app.senders.email_sender import EmailSender
 
 # Import Discord Alert Utility with error handling
 try:
@@ -49,9 +46,14 @@ class AutomationRunner:
     """Main automation workflow orchestrator"""
 
     def __init__(self):
+        # Imported here so --stats skips loading the pipeline stages (tldextract, dnspython, orjson)
+        from app.scrapers.hvac_scraper import HVACLeadScraper
+        from app.enrichers.email_enricher import EmailEnricher
+
         self.scraper = HVACLeadScraper()
         self.enricher = EmailEnricher()
-        self.sender = EmailSender()
+        # Built on first use so --scrape-only/--enrich-only don't need Mailgun credentials
+        self._sender = None
 
         # Workflow settings
         self.run_scraping = True
@@ -206,6 +208,14 @@ class AutomationRunner:
                 'success': False
             }
 
+    @property
+    def sender(self):
+        """Mailgun sender, created the first time sending or notification needs it"""
+        if self._sender is None:
+            from app.senders.email_sender import EmailSender
+            self._sender = EmailSender()
+        return self._sender
+
     def run_email_sending(self) -> Dict[str, Any]:
         """Run email sending workflow"""
         logger.info("📬 Starting email sending workflow...")